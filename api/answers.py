@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import re
+import logging
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .llm import get_provider
+
+
+logger = logging.getLogger("api.answers")
+
+# Seconds between metric log lines
+REPORT_INTERVAL = 60
+
+_answers = None
+_answers_key = None
+
+
+def get_answers():
+    """The process's AnswerService, rebuilt alongside the provider."""
+    global _answers, _answers_key
+
+    key = (settings.CHAT_PROVIDER, asyncio.get_running_loop())
+    if _answers is None or _answers_key != key:
+        _answers = AnswerService(settings.CHAT_CACHE_SIZE, settings.CHAT_CACHE_TTL)
+        _answers_key = key
+    return _answers
+
+
+# ---------------------- KEYS ----------------------
+def normalize_prompt(text):
+    """Case, spacing and trailing punctuation do not change the question."""
+    return re.sub(r"\s+", " ", text).strip().rstrip("?!. ").lower()
+
+
+def answer_key(messages, **params):
+    normalized = [{"role": m["role"], "content": normalize_prompt(m["content"])} for m in messages]
+    raw = json.dumps({"messages": normalized, **params}, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ---------------------- CACHE ----------------------
+class AnswerCache:
+    """In-process LRU of finished answers, each kept for at most `ttl` seconds."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, text, duration):
+        if self.size <= 0:
+            return
+        self.entries[key] = {"text": text, "duration": duration, "expires": time.monotonic() + self.ttl}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# ---------------------- IN-FLIGHT REQUESTS ----------------------
+class Flight:
+    """
+    One upstream call shared by every socket asking the same question.
+    The call runs in its own task, so the socket that started it can go
+    away without cutting off the others; it is only cancelled once nobody
+    is following it.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.duration = 0.0
+        self.followers = 0
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def run(self, stream):
+        started = time.monotonic()
+        try:
+            async for delta in stream:
+                self.chunks.append(delta)
+                self.notify()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.duration = time.monotonic() - started
+            self.done = True
+            self.notify()
+
+    async def follow(self):
+        """Yield every delta so far, then new ones as they arrive."""
+        self.followers += 1
+        try:
+            sent = 0
+            while True:
+                while sent < len(self.chunks):
+                    yield self.chunks[sent]
+                    sent += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self.changed.wait()
+        finally:
+            self.followers -= 1
+            if not self.followers and not self.done:
+                self.task.cancel()
+
+
+# ---------------------- SERVICE ----------------------
+class AnswerService:
+    """
+    Front for the chat provider: answers repeated questions from the
+    cache and coalesces identical requests already in flight, so one
+    upstream call serves all of them.
+    """
+
+    def __init__(self, size, ttl):
+        self.cache = AnswerCache(size, ttl)
+        self.flights = {}
+        self.upstream_slots = asyncio.Semaphore(settings.CHAT_MAX_IN_FLIGHT)
+        self.counts = {"requests": 0, "hits": 0, "coalesced": 0, "upstream": 0}
+        self.saved_seconds = 0.0
+        self.last_report = time.monotonic()
+
+    async def stream(self, messages, **params):
+        key = answer_key(messages, **{k: v for k, v in params.items() if k != "timeout"})
+        self.counts["requests"] += 1
+        self.maybe_report()
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.counts["hits"] += 1
+            self.saved_seconds += entry["duration"]
+            yield entry["text"]
+            return
+
+        # A flight nobody follows any more is being cancelled: start afresh
+        flight = self.flights.get(key)
+        coalesced = flight is not None and flight.followers > 0
+        if coalesced:
+            self.counts["coalesced"] += 1
+        else:
+            self.counts["upstream"] += 1
+            flight = Flight()
+            flight.task = asyncio.create_task(self.call_upstream(flight, messages, params))
+            flight.task.add_done_callback(lambda task: self.land(key, flight))
+            self.flights[key] = flight
+
+        async for delta in flight.follow():
+            yield delta
+        if coalesced:
+            self.saved_seconds += flight.duration
+
+    async def call_upstream(self, flight, messages, params):
+        # Caps open upstream requests (and their sockets and buffers) across
+        # every chat in the process; the rest wait here for a slot
+        async with self.upstream_slots:
+            await flight.run(get_provider().stream(messages, **params))
+
+    def land(self, key, flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        if flight.error is None and not flight.task.cancelled():
+            self.cache.set(key, "".join(flight.chunks), flight.duration)
+
+    def metrics(self):
+        requests = self.counts["requests"]
+        return {
+            **self.counts,
+            "hit_rate": self.counts["hits"] / requests if requests else 0.0,
+            "coalescing_rate": self.counts["coalesced"] / requests if requests else 0.0,
+            "saved_upstream_seconds": round(self.saved_seconds, 3),
+            "cached_answers": len(self.cache),
+            "in_flight": len(self.flights),
+        }
+
+    def maybe_report(self):
+        if time.monotonic() - self.last_report < REPORT_INTERVAL:
+            return
+        self.last_report = time.monotonic()
+        logger.info("Chat answers: %s", " ".join(f"{name}={value}" for name, value in self.metrics().items()))
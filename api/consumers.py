@@ -1,32 +1,109 @@
+import asyncio
 import json
+import logging
+
 from channels.generic.websocket import AsyncWebsocketConsumer
-from groq import Groq
 from django.conf import settings
 
+from .answers import get_answers
+from .limits import get_limiter
+from .memory import ConversationMemory
+
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful study assistant."
+
+
 class ChatConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
+        # Messages waiting for an answer, answered one at a time. The queue
+        # is bounded so a client cannot pile up work in memory.
+        self.queue = asyncio.Queue(maxsize=settings.CHAT_QUEUE_SIZE)
+        self.worker = asyncio.create_task(self.answer_queue())
+        self.memory = ConversationMemory(settings.CHAT_HISTORY_EXCHANGES, settings.CHAT_HISTORY_TOKENS)
         await self.accept()
 
+    async def disconnect(self, code):
+        # Also cancels the reply in progress, and with it the upstream call
+        self.worker.cancel()
+        self.memory.clear()
+
+    def client_id(self):
+        user = self.scope.get("user")
+        if user is not None and user.is_authenticated:
+            return f"user:{user.id}"
+        if self.scope.get("client"):
+            return f"ip:{self.scope['client'][0]}"
+        return f"socket:{id(self)}"
+
     async def receive(self, text_data):
         data = json.loads(text_data)
         user_message = data["message"]
+        message_id = data.get("id")
+
+        if self.queue.full():
+            await self.send_busy(message_id, 1)
+            return
+
+        retry_after = get_limiter().acquire(self.client_id())
+        if retry_after:
+            await self.send_busy(message_id, retry_after)
+            return
+
+        self.queue.put_nowait((user_message, message_id))
 
-        # ✅ Initialize AFTER settings are loaded
-        client = Groq(api_key=settings.GROQ_API_KEY)
-
-        completion = client.chat.completions.create(
-            model="openai/gpt-oss-120b",
-            messages=[
-                {"role": "system", "content": "You are a helpful study assistant."},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.6,
-            max_tokens=300
+    async def answer_queue(self):
+        # Runs as a task so this consumer keeps handling frames (and
+        # notices a disconnect) while the upstream call is in flight
+        while True:
+            user_message, message_id = await self.queue.get()
+            await self.reply(user_message, message_id)
+
+    async def send_busy(self, message_id, retry_after):
+        await self.send_frame(
+            "busy", message_id,
+            retry_after=retry_after,
+            error=f"Busy, retry in {retry_after} s.",
         )
 
-        ai_reply = completion.choices[0].message.content
+    async def send_frame(self, frame_type, message_id, **fields):
+        # The client's message id is echoed on every frame so replies and
+        # busy notices can be matched to their message
+        await self.send(text_data=json.dumps({"type": frame_type, "id": message_id, **fields}))
+
+    async def reply(self, user_message, message_id=None):
+        """
+        Stream the answer as "delta" frames as tokens arrive, then a "done"
+        frame carrying the whole reply, or an "error" frame.
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            *self.memory.messages(),
+            {"role": "user", "content": user_message},
+        ]
+
+        chunks = []
+        try:
+            async with asyncio.timeout(settings.CHAT_TIMEOUT):
+                async for delta in get_answers().stream(
+                    messages,
+                    model=settings.CHAT_MODEL,
+                    temperature=0.6,
+                    max_tokens=300,
+                    timeout=settings.CHAT_TIMEOUT,
+                ):
+                    chunks.append(delta)
+                    await self.send_frame("delta", message_id, text=delta)
+        except TimeoutError:
+            await self.send_frame("error", message_id, error="The assistant took too long to answer. Please try again.")
+            return
+        except Exception:
+            logger.exception("Chat completion failed")
+            await self.send_frame("error", message_id, error="The assistant is unavailable right now.")
+            return
 
-        await self.send(text_data=json.dumps({
-            "reply": ai_reply
-        }))
+        ai_reply = "".join(chunks)
+        self.memory.add(user_message, ai_reply)
+        await self.send_frame("done", message_id, reply=ai_reply)
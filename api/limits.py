@@ -0,0 +1,89 @@
+import math
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+# Per-client buckets kept in memory; the least recently used (by then
+# normally full again, so forgetting it changes nothing) go first
+MAX_TRACKED_CLIENTS = 10_000
+
+_limiter = None
+_limiter_key = None
+
+
+def get_limiter():
+    global _limiter, _limiter_key
+
+    key = (
+        settings.CHAT_USER_RATE, settings.CHAT_USER_BURST,
+        settings.CHAT_GLOBAL_RATE, settings.CHAT_GLOBAL_BURST,
+    )
+    if _limiter is None or _limiter_key != key:
+        _limiter = ChatLimiter(*key)
+        _limiter_key = key
+    return _limiter
+
+
+# ---------------------- TOKEN BUCKET ----------------------
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is now)."""
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+# ---------------------- CHAT LIMITER ----------------------
+class ChatLimiter:
+    """
+    Admission control for chat messages: a bucket per client plus one for
+    the whole process. A message costs a token from both, or from neither.
+    """
+
+    def __init__(self, user_rate, user_burst, global_rate, global_burst):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.clients = OrderedDict()
+        self.everyone = TokenBucket(global_rate, global_burst)
+
+    def bucket(self, client):
+        bucket = self.clients.get(client)
+        if bucket is None:
+            bucket = self.clients[client] = TokenBucket(self.user_rate, self.user_burst)
+            while len(self.clients) > MAX_TRACKED_CLIENTS:
+                self.clients.popitem(last=False)
+        self.clients.move_to_end(client)
+        return bucket
+
+    def acquire(self, client):
+        """
+        Take a token for `client`'s message. Returns 0 when admitted,
+        otherwise the whole number of seconds to wait before retrying.
+        """
+        bucket = self.bucket(client)
+        wait = max(bucket.wait_time(), self.everyone.wait_time())
+        if wait:
+            return math.ceil(wait)
+
+        bucket.take()
+        self.everyone.take()
+        return 0
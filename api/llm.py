@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+from django.conf import settings
+
+
+PROVIDERS = {}
+
+# One provider (and so one connection pool) per process. It is rebuilt if
+# CHAT_PROVIDER or the event loop changes, since pooled connections belong
+# to the loop that opened them.
+_provider = None
+_provider_key = None
+
+
+# ---------------------- PROVIDER REGISTRY ----------------------
+def provider(name):
+    """Register a ChatProvider subclass under the given CHAT_PROVIDER name."""
+    def register(cls):
+        PROVIDERS[name] = cls
+        return cls
+    return register
+
+
+def get_provider():
+    global _provider, _provider_key
+
+    key = (settings.CHAT_PROVIDER, asyncio.get_running_loop())
+    if _provider is None or _provider_key != key:
+        _provider = PROVIDERS[settings.CHAT_PROVIDER]()
+        _provider_key = key
+    return _provider
+
+
+class ChatProvider:
+    """
+    Backend for chat completions. complete() must be a coroutine that
+    never blocks the event loop, so one worker can serve many sockets.
+    Backends that can stream override stream() as well.
+    """
+
+    async def complete(self, messages, *, model, temperature, max_tokens, timeout):
+        raise NotImplementedError
+
+    async def stream(self, messages, **params):
+        """Yield the reply as text deltas. By default, in a single piece."""
+        yield await self.complete(messages, **params)
+
+    async def aclose(self):
+        pass
+
+
+# ---------------------- GROQ ----------------------
+@provider("groq")
+class GroqProvider(ChatProvider):
+
+    def __init__(self):
+        from groq import AsyncGroq
+
+        limits = httpx.Limits(
+            max_connections=settings.CHAT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CHAT_MAX_CONNECTIONS,
+        )
+        self.client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            max_retries=1,
+            http_client=httpx.AsyncClient(limits=limits, timeout=settings.CHAT_TIMEOUT),
+        )
+
+    async def complete(self, messages, *, model, temperature, max_tokens, timeout):
+        completion = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        return completion.choices[0].message.content or ""
+
+    async def stream(self, messages, *, model, temperature, max_tokens, timeout):
+        chunks = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True,
+        )
+        try:
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closes the upstream response when the socket goes away mid-reply
+            await chunks.close()
+
+    async def aclose(self):
+        await self.client.close()
+
+
+# ---------------------- LOCAL STUB ----------------------
+@provider("stub")
+class StubProvider(ChatProvider):
+    """
+    Offline backend for development and load tests: waits CHAT_STUB_LATENCY
+    seconds like a real upstream call would, then echoes the question,
+    streaming it a word every CHAT_STUB_TOKEN_DELAY seconds.
+    """
+
+    def answer(self, messages):
+        return f"(stub) You asked: {messages[-1]['content']}"
+
+    async def complete(self, messages, *, model, temperature, max_tokens, timeout):
+        answer = self.answer(messages)
+        words = len(answer.split(" "))
+        await asyncio.sleep(settings.CHAT_STUB_LATENCY + settings.CHAT_STUB_TOKEN_DELAY * (words - 1))
+        return answer
+
+    async def stream(self, messages, *, model, temperature, max_tokens, timeout):
+        await asyncio.sleep(settings.CHAT_STUB_LATENCY)
+        for i, word in enumerate(self.answer(messages).split(" ")):
+            if i:
+                await asyncio.sleep(settings.CHAT_STUB_TOKEN_DELAY)
+            yield word if i == 0 else " " + word
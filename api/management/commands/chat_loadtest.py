@@ -0,0 +1,91 @@
+import asyncio
+import json
+import statistics
+import time
+
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from api.answers import get_answers
+from api.consumers import ChatConsumer
+
+
+class Command(BaseCommand):
+    help = "Run many simultaneous chats against ChatConsumer in this process and report latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200, help="Simultaneous sockets.")
+        parser.add_argument("--messages", type=int, default=3, help="Messages sent by each socket, one at a time.")
+        parser.add_argument("--provider", default="stub", help="CHAT_PROVIDER to test against.")
+        parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each reply.")
+        parser.add_argument("--questions", type=int, default=0,
+                            help="Draw messages from this many distinct questions (0: all distinct).")
+        parser.add_argument("--unlimited", action="store_true",
+                            help="Lift the per-client and global rate limits for this run.")
+
+    def handle(self, *args, **options):
+        overrides = {"CHAT_PROVIDER": options["provider"]}
+        if options["unlimited"]:
+            overrides.update(CHAT_USER_RATE=1e9, CHAT_USER_BURST=10**9, CHAT_GLOBAL_RATE=1e9, CHAT_GLOBAL_BURST=10**9)
+
+        with override_settings(**overrides):
+            first_tokens, latencies, errors, busy, elapsed, metrics = asyncio.run(self.run(options))
+
+        total = len(latencies) + errors
+        self.stdout.write(f"chats: {options['clients']} x {options['messages']} messages ({options['provider']})")
+        self.stdout.write(f"replies: {len(latencies)}  errors: {errors}  busy: {busy}  wall time: {elapsed:.2f}s")
+        self.stdout.write(f"throughput: {total / elapsed:.1f} replies/s")
+        self.report("time to first token", first_tokens)
+        self.report("full reply", latencies)
+        self.stdout.write(
+            f"cache hits: {metrics['hits']}  coalesced: {metrics['coalesced']}  upstream calls: {metrics['upstream']}  "
+            f"hit rate: {metrics['hit_rate']:.0%}  coalescing rate: {metrics['coalescing_rate']:.0%}  "
+            f"saved upstream time: {metrics['saved_upstream_seconds']:.1f}s"
+        )
+
+    def report(self, label, samples):
+        if len(samples) < 2:
+            return
+        cuts = statistics.quantiles(samples, n=100)
+        self.stdout.write(
+            f"{label} p50: {cuts[49] * 1000:.0f} ms  p95: {cuts[94] * 1000:.0f} ms  "
+            f"max: {max(samples) * 1000:.0f} ms"
+        )
+
+    async def run(self, options):
+        first_tokens = []
+        latencies = []
+        errors = busy = 0
+
+        async def chat(n):
+            nonlocal errors, busy
+            communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+            await communicator.connect()
+            try:
+                for i in range(options["messages"]):
+                    started = time.monotonic()
+                    number = (n * options["messages"] + i) % options["questions"] if options["questions"] else f"{i} from chat {n}"
+                    await communicator.send_to(text_data=json.dumps({"id": i, "message": f"question {number}"}))
+                    first_token = None
+                    while True:
+                        frame = json.loads(await communicator.receive_from(timeout=options["timeout"]))
+                        if frame["type"] == "delta" and first_token is None:
+                            first_token = time.monotonic() - started
+                        elif frame["type"] != "delta":
+                            break
+
+                    if frame["type"] == "busy":
+                        busy += 1
+                    elif frame["type"] == "error":
+                        errors += 1
+                    else:
+                        first_tokens.append(first_token if first_token is not None else time.monotonic() - started)
+                        latencies.append(time.monotonic() - started)
+            finally:
+                await communicator.disconnect()
+
+        started = time.monotonic()
+        await asyncio.gather(*(chat(n) for n in range(options["clients"])))
+        elapsed = time.monotonic() - started
+        return first_tokens, latencies, errors, busy, elapsed, get_answers().metrics()
@@ -0,0 +1,49 @@
+from collections import deque
+
+
+def estimate_tokens(text):
+    # About four characters per token for English text; close enough for a
+    # budget, and needs no tokenizer
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Recent exchanges of one chat, oldest first, bounded both in number
+    (a ring buffer of `max_exchanges`) and in estimated tokens. Whole
+    exchanges are dropped from the old end, so the history never opens
+    with an answer to a question that is no longer there.
+    """
+
+    def __init__(self, max_exchanges, token_budget):
+        self.exchanges = deque(maxlen=max_exchanges)
+        self.token_budget = token_budget
+        self.tokens = 0
+
+    def add(self, question, answer):
+        cost = estimate_tokens(question) + estimate_tokens(answer)
+        if not self.exchanges.maxlen or cost > self.token_budget:
+            # Memory is off, or this exchange alone would not fit
+            return
+
+        if len(self.exchanges) == self.exchanges.maxlen:
+            self.tokens -= self.exchanges[0][2]
+        self.exchanges.append((question, answer, cost))
+        self.tokens += cost
+
+        while self.tokens > self.token_budget:
+            self.tokens -= self.exchanges.popleft()[2]
+
+    def messages(self):
+        history = []
+        for question, answer, _ in self.exchanges:
+            history.append({"role": "user", "content": question})
+            history.append({"role": "assistant", "content": answer})
+        return history
+
+    def clear(self):
+        self.exchanges.clear()
+        self.tokens = 0
+
+    def __len__(self):
+        return len(self.exchanges)
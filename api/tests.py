@@ -1,3 +1,232 @@
-from django.test import TestCase
+import asyncio
+import json
 
-# Create your tests here.
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, override_settings
+
+from .answers import AnswerCache, get_answers
+from .consumers import ChatConsumer
+from .llm import ChatProvider, provider
+from .memory import ConversationMemory
+
+
+@provider("test-hang")
+class HangingProvider(ChatProvider):
+    """Never answers; records that the call started and was cancelled."""
+
+    started = None
+    cancelled = None
+    calls = 0
+
+    async def complete(self, messages, **params):
+        HangingProvider.calls += 1
+        self.started.set()
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+@provider("test-record")
+class RecordingProvider(ChatProvider):
+    """Answers at once and keeps the messages of every call."""
+
+    calls = []
+
+    async def complete(self, messages, **params):
+        RecordingProvider.calls.append(messages)
+        return f"answer {len(RecordingProvider.calls)}"
+
+
+async def read_reply(communicator):
+    """Skip delta frames and return the final one."""
+    while True:
+        frame = json.loads(await communicator.receive_from(timeout=5))
+        if frame["type"] != "delta":
+            return frame
+
+
+# ---------------------- CHAT CONSUMER ----------------------
+class ChatConsumerTests(SimpleTestCase):
+
+    async def connect(self):
+        HangingProvider.started = asyncio.Event()
+        HangingProvider.cancelled = asyncio.Event()
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    @override_settings(CHAT_PROVIDER="stub", CHAT_STUB_LATENCY=0, CHAT_STUB_TOKEN_DELAY=0.05)
+    async def test_reply_streams_as_deltas(self):
+        communicator = await self.connect()
+        await communicator.send_to(text_data=json.dumps({"id": 7, "message": "what is a join"}))
+
+        frames = []
+        while not frames or frames[-1]["type"] == "delta":
+            frames.append(json.loads(await communicator.receive_from(timeout=5)))
+
+        deltas = [f["text"] for f in frames if f["type"] == "delta"]
+        self.assertGreater(len(deltas), 3)
+        self.assertEqual(frames[-1], {"type": "done", "id": 7, "reply": "".join(deltas)})
+        await communicator.disconnect()
+
+    @override_settings(CHAT_PROVIDER="stub", CHAT_STUB_LATENCY=0.2, CHAT_STUB_TOKEN_DELAY=0)
+    async def test_concurrent_chats_do_not_block_each_other(self):
+        communicators = [await self.connect() for _ in range(20)]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for i, communicator in enumerate(communicators):
+            await communicator.send_to(text_data=json.dumps({"message": f"question {i}"}))
+        replies = [await read_reply(c) for c in communicators]
+
+        # Twenty 0.2 s calls overlap instead of queueing behind each other
+        self.assertLess(loop.time() - started, 2)
+        self.assertEqual(replies[3]["reply"], "(stub) You asked: question 3")
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    @override_settings(CHAT_PROVIDER="test-hang", CHAT_TIMEOUT=60)
+    async def test_disconnect_cancels_upstream_call(self):
+        communicator = await self.connect()
+        await communicator.send_to(text_data=json.dumps({"message": "hello"}))
+        await asyncio.wait_for(HangingProvider.started.wait(), timeout=5)
+
+        await communicator.disconnect()
+        await asyncio.wait_for(HangingProvider.cancelled.wait(), timeout=5)
+
+    @override_settings(CHAT_PROVIDER="test-hang", CHAT_TIMEOUT=0.1)
+    async def test_timeout_sends_error(self):
+        communicator = await self.connect()
+        await communicator.send_to(text_data=json.dumps({"message": "hello"}))
+        frame = json.loads(await communicator.receive_from(timeout=5))
+        self.assertEqual(frame["type"], "error")
+        await communicator.disconnect()
+
+
+# ---------------------- BACKPRESSURE ----------------------
+class ChatBackpressureTests(SimpleTestCase):
+
+    async def connect(self):
+        HangingProvider.started = asyncio.Event()
+        HangingProvider.cancelled = asyncio.Event()
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        await communicator.connect()
+        return communicator
+
+    async def send(self, communicator, message_id, message="hello"):
+        await communicator.send_to(text_data=json.dumps({"id": message_id, "message": message}))
+
+    @override_settings(CHAT_PROVIDER="stub", CHAT_STUB_LATENCY=0, CHAT_USER_RATE=0.1, CHAT_USER_BURST=2)
+    async def test_rate_limited_message_gets_busy_frame(self):
+        communicator = await self.connect()
+        for i in range(3):
+            await self.send(communicator, i, f"question {i}")
+
+        frames = [await read_reply(communicator) for _ in range(3)]
+        busy = [f for f in frames if f["type"] == "busy"]
+        self.assertEqual(len(busy), 1)
+        self.assertEqual((busy[0]["id"], busy[0]["retry_after"]), (2, 10))
+        await communicator.disconnect()
+
+    @override_settings(CHAT_PROVIDER="test-hang", CHAT_TIMEOUT=60, CHAT_QUEUE_SIZE=1)
+    async def test_full_queue_rejects_immediately(self):
+        communicator = await self.connect()
+        await self.send(communicator, 1)
+        await asyncio.wait_for(HangingProvider.started.wait(), timeout=5)
+
+        # One being answered, one waiting, the third turned away
+        await self.send(communicator, 2)
+        await self.send(communicator, 3)
+        frame = json.loads(await communicator.receive_from(timeout=5))
+        self.assertEqual((frame["type"], frame["id"]), ("busy", 3))
+        await communicator.disconnect()
+
+    @override_settings(CHAT_PROVIDER="test-hang", CHAT_TIMEOUT=60, CHAT_MAX_IN_FLIGHT=2)
+    async def test_upstream_calls_are_capped(self):
+        HangingProvider.calls = 0
+        communicators = [await self.connect() for _ in range(5)]
+        for i, communicator in enumerate(communicators):
+            await self.send(communicator, i, f"question {i}")
+
+        await asyncio.sleep(0.2)
+        self.assertEqual(HangingProvider.calls, 2)
+        for communicator in communicators:
+            await communicator.disconnect()
+
+
+# ---------------------- ANSWER CACHE ----------------------
+class AnswerCacheTests(SimpleTestCase):
+
+    def test_lru_eviction(self):
+        cache = AnswerCache(size=2, ttl=60)
+        cache.set("a", "A", 1.0)
+        cache.set("b", "B", 1.0)
+        cache.get("a")
+        cache.set("c", "C", 1.0)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")["text"], "A")
+
+    @override_settings(CHAT_PROVIDER="stub", CHAT_STUB_LATENCY=0.2, CHAT_STUB_TOKEN_DELAY=0)
+    async def test_identical_questions_share_one_upstream_call(self):
+        communicators = []
+        for _ in range(5):
+            communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+            await communicator.connect()
+            communicators.append(communicator)
+
+        for i, communicator in enumerate(communicators):
+            question = "Explain normalization in DBMS?" if i % 2 else "explain  normalization in dbms"
+            await communicator.send_to(text_data=json.dumps({"message": question}))
+
+        # The first asker leaves; the others still get the shared answer
+        await communicators[0].disconnect()
+        replies = [await read_reply(c) for c in communicators[1:]]
+        self.assertEqual(len({r["reply"] for r in replies}), 1)
+
+        # Asked afresh on a new socket (no history), it comes from the cache
+        later = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        await later.connect()
+        await later.send_to(text_data=json.dumps({"message": "Explain normalization in DBMS."}))
+        self.assertEqual((await read_reply(later))["type"], "done")
+        communicators.append(later)
+
+        metrics = get_answers().metrics()
+        self.assertEqual((metrics["upstream"], metrics["coalesced"], metrics["hits"]), (1, 4, 1))
+        for communicator in communicators[1:]:
+            await communicator.disconnect()
+
+
+# ---------------------- CONVERSATION MEMORY ----------------------
+class ConversationMemoryTests(SimpleTestCase):
+
+    def test_bounded_by_exchanges_and_tokens(self):
+        memory = ConversationMemory(max_exchanges=3, token_budget=100)
+        for i in range(5):
+            memory.add(f"question {i}", f"answer {i}")
+        self.assertEqual([m["content"] for m in memory.messages()[::2]], ["question 2", "question 3", "question 4"])
+
+        # A long answer pushes out older exchanges to stay within budget
+        memory.add("question 5", "x" * 380)
+        self.assertEqual(len(memory), 1)
+        self.assertLessEqual(memory.tokens, 100)
+
+    @override_settings(CHAT_PROVIDER="test-record", CHAT_CACHE_SIZE=0, CHAT_HISTORY_EXCHANGES=2)
+    async def test_follow_ups_carry_recent_history(self):
+        RecordingProvider.calls = []
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), "/ws/chat/")
+        await communicator.connect()
+        for i in range(4):
+            await communicator.send_to(text_data=json.dumps({"id": i, "message": f"question {i}"}))
+            await read_reply(communicator)
+        await communicator.disconnect()
+
+        self.assertEqual(RecordingProvider.calls[-1][1:], [
+            {"role": "user", "content": "question 1"},
+            {"role": "assistant", "content": "answer 2"},
+            {"role": "user", "content": "question 2"},
+            {"role": "assistant", "content": "answer 3"},
+            {"role": "user", "content": "question 3"},
+        ])
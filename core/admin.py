@@ -7,7 +7,11 @@ from .models import (
     Resource,
     ApprovedUploader,
     TutorialSuggestion,
-    Bookmark
+    Bookmark,
+    DashboardCounter,
+    ResourceContent,
+    Job,
+    UploadSession,
 )
 
 
@@ -22,7 +26,7 @@ class DepartmentAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" width="60" height="40" style="border-radius:4px; object-fit:cover;" />',
-                obj.image.url
+                obj.image_thumbnail_url
             )
         return "No Image"
     image_preview.short_description = "Preview"
@@ -86,3 +90,32 @@ class TutorialSuggestionAdmin(admin.ModelAdmin):
 class BookmarkAdmin(admin.ModelAdmin):
     list_display = ("user", "resource", "created_at")
     search_fields = ("user__username", "resource__title")
+
+
+@admin.register(DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    list_display = ("name", "value")
+    readonly_fields = ("name", "value")
+
+
+@admin.register(ResourceContent)
+class ResourceContentAdmin(admin.ModelAdmin):
+    list_display = ("resource", "status", "page_count", "file_size", "extracted_at")
+    list_filter = ("status",)
+    search_fields = ("resource__title",)
+    readonly_fields = ("created_at", "extracted_at")
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task", "queue", "status", "attempts", "run_at", "locked_by")
+    list_filter = ("queue", "status", "task")
+    readonly_fields = ("created_at", "locked_at", "last_error")
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("filename", "user", "status", "offset", "size", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("filename", "user__username")
+    readonly_fields = ("created_at", "updated_at")
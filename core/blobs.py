@@ -0,0 +1,107 @@
+import hashlib
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, ProtectedError, Q
+
+from .models import Resource, StoredFile
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------- HASHING ----------------------
+def file_sha256(fileobj):
+    """
+    SHA-256 of an uploaded file. Uses the digest computed by the hashing
+    upload handlers when present, otherwise streams the file in chunks.
+    """
+    sha = getattr(fileobj, "sha256", None)
+    if sha:
+        return sha
+
+    hasher = hashlib.sha256()
+    for chunk in fileobj.chunks():
+        hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
+
+def find_duplicate(sha, user):
+    """
+    An existing Resource that already uses this content, if any, among
+    those `user` may see: approved resources and their own uploads.
+    Pending or rejected uploads of other users are never revealed.
+    """
+    return (
+        Resource.objects.filter(blob__sha256=sha)
+        .filter(Q(status="approved") | Q(uploaded_by=user))
+        .select_related("subject")
+        .order_by("uploaded_at")
+        .first()
+    )
+
+
+# ---------------------- STORE ----------------------
+def store_file(fileobj, name):
+    """Return the StoredFile for this content, writing it only if new."""
+    sha = file_sha256(fileobj)
+
+    blob = StoredFile.objects.filter(sha256=sha).first()
+    if blob is not None:
+        return blob
+
+    blob = StoredFile(sha256=sha, size=fileobj.size)
+    blob.file.save(name, fileobj, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Another request stored the same content concurrently
+        blob.file.delete(save=False)
+        blob = StoredFile.objects.get(sha256=sha)
+    return blob
+
+
+# ---------------------- REFERENCE COUNTING ----------------------
+def add_reference(blob_id):
+    StoredFile.objects.filter(id=blob_id).update(ref_count=F("ref_count") + 1)
+
+
+def drop_reference(blob_id):
+    StoredFile.objects.filter(id=blob_id, ref_count__gt=0).update(ref_count=F("ref_count") - 1)
+    transaction.on_commit(lambda: collect_blob(blob_id))
+
+
+def collect_blob(blob_id):
+    """Delete a blob (row and file) once nothing references it."""
+    with transaction.atomic():
+        blob = (
+            StoredFile.objects.select_for_update()
+            .filter(id=blob_id, ref_count=0)
+            .first()
+        )
+        if blob is None:
+            return False
+        try:
+            blob.delete()
+        except ProtectedError:
+            # ref_count drifted; 'manage.py collect_blobs' repairs it
+            return False
+
+    blob.file.delete(save=False)
+    return True
+
+
+def recount_references():
+    """Recompute every blob's ref_count from the Resource table."""
+    counts = dict(
+        Resource.objects.filter(blob__isnull=False)
+        .order_by()
+        .values_list("blob")
+        .annotate(total=Count("id"))
+    )
+    for blob in StoredFile.objects.only("id", "ref_count").iterator():
+        actual = counts.get(blob.id, 0)
+        if blob.ref_count != actual:
+            StoredFile.objects.filter(id=blob.id).update(ref_count=actual)
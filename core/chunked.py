@@ -0,0 +1,132 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import UploadSession
+
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class AssembledFile(File):
+    """
+    A finished upload on local disk. It exposes temporary_file_path() like
+    Django's TemporaryUploadedFile, so FileSystemStorage moves it into
+    place instead of copying it, and carries its SHA-256 for deduplication.
+    """
+
+    def __init__(self, path, name, sha256):
+        super().__init__(open(path, "rb"), name=name)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+# ---------------------- SESSION ----------------------
+def start_session(user, filename, size, sha256=""):
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise ChunkError(f"File size must be between 1 byte and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.")
+
+    session = UploadSession.objects.create(
+        user=user,
+        filename=os.path.basename(filename)[:255] or "upload",
+        size=size,
+        chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        sha256=sha256.lower(),
+    )
+
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(session.path, "wb").close()
+
+    enqueue(
+        "core.expire_upload_session",
+        {"upload_id": str(session.id)},
+        delay=settings.CHUNKED_UPLOAD_TTL,
+    )
+    return session
+
+
+def discard_session(session, status):
+    if os.path.exists(session.path):
+        os.remove(session.path)
+    session.status = status
+    session.save(update_fields=["status", "resource", "updated_at"])
+
+
+# ---------------------- CHUNKS ----------------------
+def write_chunk(session, offset, stream, length, checksum):
+    """
+    Stream one chunk from the request body straight to its place in the
+    partial file, verifying its SHA-256 before advancing the offset.
+    Only the chunk at the current offset is accepted, so a client resumes
+    by asking for the session's offset and continuing from there.
+    """
+    if offset != session.offset:
+        raise ChunkError(f"Expected offset {session.offset}.", status=409)
+
+    expected = min(session.chunk_size, session.size - offset)
+    if length != expected:
+        raise ChunkError(f"Chunk at offset {offset} must be {expected} bytes.")
+
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(session.path, "r+b") as out:
+        out.seek(offset)
+        while remaining > 0:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            hasher.update(data)
+            out.write(data)
+            remaining -= len(data)
+        out.flush()
+        os.fsync(out.fileno())
+
+    if remaining:
+        raise ChunkError("Chunk body ended early.")
+    if hasher.hexdigest() != checksum.lower():
+        raise ChunkError("Chunk checksum mismatch.", status=422)
+
+    # Bytes past the offset are simply overwritten on retry, so a failed
+    # chunk needs no cleanup. The conditional update rejects a concurrent
+    # duplicate of the same chunk.
+    updated = UploadSession.objects.filter(
+        id=session.id, status="active", offset=offset
+    ).update(offset=offset + length, updated_at=timezone.now())
+    if not updated:
+        raise ChunkError("Chunk was already received.", status=409)
+
+    session.offset = offset + length
+    return session
+
+
+# ---------------------- ASSEMBLY ----------------------
+def assemble(session):
+    """Verify a fully received session and return it as an AssembledFile."""
+    if session.offset != session.size:
+        raise ChunkError(f"Upload incomplete: {session.offset} of {session.size} bytes received.", status=409)
+
+    # Read back from disk in blocks: never holds more than READ_SIZE in memory
+    hasher = hashlib.sha256()
+    with open(session.path, "rb") as part:
+        for block in iter(lambda: part.read(READ_SIZE), b""):
+            hasher.update(block)
+    sha = hasher.hexdigest()
+
+    if session.sha256 and sha != session.sha256:
+        raise ChunkError("File checksum mismatch.", status=422)
+
+    return AssembledFile(session.path, session.filename, sha)
@@ -0,0 +1,82 @@
+import hashlib
+
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.messages.storage.session import SessionStorage
+from django.middleware.csrf import get_token
+
+from .fragments import get_version, get_versions
+from .permissions import is_approved_uploader
+
+
+# Validators for the conditional GET support on subject and department
+# pages (django.views.decorators.http.condition). Built from version stamps
+# only, read in one query, so answering a revalidation never touches the
+# page's own rows. ETags only: a Last-Modified date cannot reflect changes
+# to the viewer (their role or uploader approval) that alter the page.
+
+
+def has_pending_messages(request):
+    # A 304 would leave the flash message undisplayed
+    return (
+        CookieStorage.cookie_name in request.COOKIES
+        or SessionStorage.session_key in request.session
+    )
+
+
+def csrf_secret(request):
+    # Pages embed a CSRF token derived from the viewer's secret. get_token()
+    # mints one when the request has none, as rendering would.
+    get_token(request)
+    return request.META["CSRF_COOKIE"]
+
+
+def viewer_parts(request):
+    """Everything about the viewer that shows up on these pages, bar their bookmarks."""
+    user = request.user
+    return [
+        str(user.id),
+        user.get_username(),
+        user.get_full_name(),
+        str(user.is_staff),
+        str(user.is_superuser),
+        str(is_approved_uploader(request)),
+        csrf_secret(request),
+    ]
+
+
+def make_etag(parts):
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+# ---------------------- SUBJECT ----------------------
+def subject_etag(request, id):
+    if has_pending_messages(request):
+        return None
+    # The viewer's uploader stamp is read along, for is_approved_uploader
+    page, bookmarks, _ = get_versions(
+        ("subject", id), ("bookmarks", request.user.id), ("uploader", request.user.id), request=request
+    )
+    if bookmarks is None:
+        bookmarks = get_version("bookmarks", request.user.id, request, create=True)
+    if page is None:
+        # Never stamped: a page not rendered yet, or no such subject (the
+        # view answers 404). Page stamps are only minted by the view.
+        return None
+    return make_etag([page, bookmarks, *viewer_parts(request)])
+
+
+# ---------------------- DEPARTMENT ----------------------
+def department_etag(request, id):
+    if has_pending_messages(request):
+        return None
+    # The viewer's uploader stamp is read along, for is_approved_uploader
+    page, bookmarks, _ = get_versions(
+        ("department", id), ("bookmarks", request.user.id), ("uploader", request.user.id), request=request
+    )
+    if bookmarks is None:
+        bookmarks = get_version("bookmarks", request.user.id, request, create=True)
+    if page is None:
+        # Never stamped: a page not rendered yet, or no such department (the
+        # view answers 404). Page stamps are only minted by the view.
+        return None
+    return make_etag([page, bookmarks, *viewer_parts(request)])
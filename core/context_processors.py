@@ -1,7 +1,4 @@
-from .models import ApprovedUploader
+from .permissions import is_approved_uploader
 
 def uploader_status(request):
-    if request.user.is_authenticated:
-        is_uploader = ApprovedUploader.objects.filter(student=request.user, is_active=True).exists()
-        return {'approved_uploader': is_uploader}
-    return {'approved_uploader': False}
+    return {'approved_uploader': is_approved_uploader(request)}
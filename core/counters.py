@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Department, Subject, Resource, DashboardCounter
+
+
+def compute_counts():
+    return {
+        DashboardCounter.DEPARTMENTS: Department.objects.count(),
+        DashboardCounter.SUBJECTS: Subject.objects.count(),
+        DashboardCounter.RESOURCES: Resource.objects.count(),
+        DashboardCounter.PENDING_RESOURCES: Resource.objects.filter(status="pending").count(),
+    }
+
+
+# ---------------------- REBUILD ----------------------
+def rebuild_counters():
+    """Recompute every counter from the source tables."""
+    counts = compute_counts()
+    with transaction.atomic():
+        for name, value in counts.items():
+            DashboardCounter.objects.update_or_create(name=name, defaults={"value": value})
+    return counts
+
+
+# ---------------------- INCREMENT / DECREMENT ----------------------
+def bump(name, delta):
+    if not delta:
+        return
+
+    updated = DashboardCounter.objects.filter(name=name).update(value=F("value") + delta)
+
+    # Missing row (fresh table or manual cleanup): rebuild from the source
+    # tables, which already include the change that triggered this bump.
+    if not updated:
+        rebuild_counters()
+
+
+# ---------------------- READ ----------------------
+def get_counters():
+    counts = dict(DashboardCounter.objects.values_list("name", "value"))
+    if len(counts) < len(DashboardCounter.NAMES):
+        counts = rebuild_counters()
+    return counts
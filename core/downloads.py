@@ -0,0 +1,155 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.text import slugify
+
+
+READ_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+# ---------------------- VALIDATORS ----------------------
+def resource_validators(resource):
+    """
+    (etag, last_modified) for a resource's file. Deduplicated files are
+    named by their SHA-256, which makes a strong ETag for free; legacy
+    files fall back to size and modification time from storage.
+    """
+    file = resource.file
+    if resource.blob_id:
+        blob = resource.blob
+        return f'"{blob.sha256}"', blob.created_at
+
+    modified = file.storage.get_modified_time(file.name)
+    return f'"{file.size:x}-{int(modified.timestamp()):x}"', modified
+
+
+# ---------------------- RANGES ----------------------
+def parse_range(header, size):
+    """
+    The (start, end) byte positions, inclusive, of a single-range Range
+    header, or None to serve the whole file. Multi-range requests are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.strip().replace(" ", ""))
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def read_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        while length > 0:
+            data = fileobj.read(min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        fileobj.close()
+
+
+# ---------------------- RESPONSES ----------------------
+def download_name(resource):
+    extension = os.path.splitext(resource.file.name)[1].lower()
+    return f"{slugify(resource.title) or 'resource'}{extension}"
+
+
+def sendfile_response(resource):
+    """
+    Empty response telling the front proxy to send the file itself. The
+    proxy then handles Range on its own.
+    """
+    response = HttpResponse()
+    if settings.SENDFILE_BACKEND == "nginx":
+        response["X-Accel-Redirect"] = settings.SENDFILE_NGINX_PREFIX + quote(resource.file.name)
+    else:
+        response["X-Sendfile"] = resource.file.path
+    return response
+
+
+def serve_resource(request, resource, versioned=False):
+    etag, last_modified = resource_validators(resource)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified.timestamp()
+    )
+    if response is None:
+        response = build_file_response(request, resource, etag)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Accept-Ranges"] = "bytes"
+    if versioned:
+        response["Cache-Control"] = f"private, max-age={settings.DOWNLOAD_MAX_AGE}, immutable"
+    else:
+        response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def build_file_response(request, resource, etag):
+    name = download_name(resource)
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    if settings.SENDFILE_BACKEND:
+        response = sendfile_response(resource)
+        response["Content-Type"] = content_type
+        response["Content-Disposition"] = f"inline; filename=\"{name}\""
+        return response
+
+    size = resource.file.size
+    header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+
+    byte_range = None
+    # A stale If-Range means the client's partial copy is out of date, so
+    # it gets the whole new file instead of a piece of it
+    if header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        return FileResponse(resource.file.open("rb"), filename=name, content_type=content_type)
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        read_range(resource.file.open("rb"), start, length),
+        status=206, content_type=content_type,
+    )
+    response["Content-Length"] = str(length)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Disposition"] = f"inline; filename=\"{name}\""
+    return response
@@ -0,0 +1,125 @@
+import logging
+
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Job, ResourceContent
+from .search import index_resource_content
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on stored text per resource, so a huge scanned PDF with an
+# OCR layer cannot produce an unbounded row
+MAX_TEXT_CHARS = 2_000_000
+
+
+# ---------------------- SCHEDULING ----------------------
+def schedule_extraction(resource):
+    # Deduplicated uploads share a blob: reuse text already extracted from it
+    if resource.blob_id:
+        existing = (
+            ResourceContent.objects.filter(resource__blob_id=resource.blob_id, status="done")
+            .exclude(resource=resource)
+            .first()
+        )
+        if existing is not None:
+            ResourceContent.objects.update_or_create(
+                resource=resource,
+                defaults={
+                    "status": "done",
+                    "text": existing.text,
+                    "page_count": existing.page_count,
+                    "file_size": existing.file_size,
+                    "error": "",
+                    "extracted_at": existing.extracted_at,
+                },
+            )
+            index_resource_content(resource.id, existing.text)
+            return
+
+    ResourceContent.objects.update_or_create(
+        resource=resource,
+        defaults={
+            "status": "pending",
+            "text": "",
+            "page_count": None,
+            "file_size": None,
+            "error": "",
+            "extracted_at": None,
+        },
+    )
+    index_resource_content(resource.id, "")
+    enqueue("core.extract_resource_text", {"resource_id": resource.id})
+
+
+# ---------------------- EXTRACTION ----------------------
+def extract_pdf_text(fileobj, max_chars=MAX_TEXT_CHARS):
+    """
+    Return (text, page_count) for a PDF file object.
+
+    Pages are parsed lazily from the stream and extraction stops once
+    `max_chars` are collected, so later pages are never parsed. Memory is
+    not bounded by one page: pypdf keeps every object it has resolved for
+    the reader's lifetime, so it grows with the pages read so far.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(fileobj)
+    page_count = len(reader.pages)
+
+    parts = []
+    remaining = max_chars
+    for page in reader.pages:
+        if remaining <= 0:
+            break
+        text = (page.extract_text() or "")[:remaining]
+        parts.append(text)
+        remaining -= len(text)
+
+    return "\n".join(parts), page_count
+
+
+def extract_resource_content(content):
+    resource = content.resource
+    file = resource.file
+
+    if not file.name.lower().endswith(".pdf"):
+        content.status = "skipped"
+    else:
+        try:
+            content.file_size = file.size
+            with file.open("rb") as fileobj:
+                content.text, content.page_count = extract_pdf_text(fileobj)
+            content.status = "done"
+        except Exception as exc:
+            logger.exception("Text extraction failed for resource %s", resource.id)
+            content.status = "failed"
+            content.error = str(exc)
+
+    content.extracted_at = timezone.now()
+    content.save()
+
+    if content.status == "done":
+        index_resource_content(resource.id, content.text)
+
+    return content
+
+
+def enqueue_pending():
+    """
+    Queue an extraction job for every pending resource that has none yet
+    (e.g. rows left over from before the job queue). Extraction itself
+    only ever runs in the worker, so it is never done twice at once.
+    """
+    queued = set(
+        Job.objects.filter(task="core.extract_resource_text", status__in=("queued", "running"))
+        .values_list("payload__resource_id", flat=True)
+    )
+    pending = (
+        ResourceContent.objects.filter(status="pending")
+        .exclude(resource_id__in=queued)
+        .order_by("created_at")
+        .values_list("resource_id", flat=True)
+    )
+    return [enqueue("core.extract_resource_text", {"resource_id": resource_id}) for resource_id in pending]
@@ -0,0 +1,74 @@
+import time
+
+from django.db import transaction
+
+from .models import VersionStamp
+
+
+# Fragments are also keyed on a version, so this only bounds how long an
+# unreachable old version lingers (and staleness of uploader names, which
+# do not bump anything)
+FRAGMENT_TIMEOUT = 60 * 60
+
+
+# ---------------------- VERSION STAMPS ----------------------
+def version_key(kind, object_id):
+    return f"{kind}:{object_id}"
+
+
+def mint():
+    return time.time_ns() // 1000
+
+
+def get_versions(*pairs, request=None, create=False):
+    """
+    Current version stamps of subject or department pages (or users'
+    bookmarks), one per (kind, object_id) pair, in a single query. Stamps
+    are the time they were minted, in microseconds, rather than counters:
+    even if the table is emptied, a stamp can never come back as a value
+    that old cached fragments were stored under.
+
+    A pair without a stamp yet reads as None, unless `create` is set: only
+    pass it once the object is known to exist, or any id in a URL would
+    add a row.
+
+    With `request`, stamps already read during that request are reused,
+    so the ETag and the page it describes agree.
+    """
+    known = {} if request is None else request.__dict__.setdefault("_version_stamps", {})
+    keys = [version_key(kind, object_id) for kind, object_id in pairs]
+
+    wanted = [key for key in keys if key not in known]
+    if wanted:
+        found = dict(VersionStamp.objects.filter(key__in=wanted).values_list("key", "version"))
+        missing = [key for key in wanted if key not in found]
+        if missing and create:
+            # Another worker may mint the same stamp at once; whichever row
+            # lands first is the one everybody reads back
+            VersionStamp.objects.bulk_create(
+                [VersionStamp(key=key, version=mint()) for key in missing], ignore_conflicts=True
+            )
+            found.update(VersionStamp.objects.filter(key__in=missing).values_list("key", "version"))
+        known.update((key, f"{version:x}") for key, version in found.items())
+
+    return [known.get(key) for key in keys]
+
+
+def get_version(kind, object_id, request=None, create=False):
+    return get_versions((kind, object_id), request=request, create=create)[0]
+
+
+def bump_version(kind, *object_ids):
+    # After commit, so a page rendered from the old rows in the meantime
+    # cannot be cached under the new stamp
+    keys = [version_key(kind, object_id) for object_id in object_ids if object_id]
+    if keys:
+        transaction.on_commit(lambda: stamp(keys))
+
+
+def stamp(keys):
+    version = mint()
+    VersionStamp.objects.bulk_create(
+        [VersionStamp(key=key, version=version) for key in keys],
+        update_conflicts=True, unique_fields=["key"], update_fields=["version"],
+    )
@@ -0,0 +1,62 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+# Card widths on the home page run from ~300px (phones) to ~450px (three
+# columns on desktop); the larger sizes cover 2x/3x screens. 160 is the
+# admin thumbnail.
+VARIANT_WIDTHS = (160, 480, 960, 1440)
+
+WEBP_QUALITY = 80
+
+
+def variant_name(name, width):
+    # The original's extension stays in the name so math.png and math.jpg
+    # in one folder do not share variants
+    directory, filename = os.path.split(name)
+    return f"{directory}/variants/{filename}-{width}w.webp"
+
+
+def generate_variants(field):
+    """
+    Write downscaled WebP copies of an image field next to the original and
+    return {width: storage name}. Never upscales: an image narrower than a
+    requested width gets one variant at its own width instead.
+    """
+    with field.open("rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or "A" in image.getbands() else "RGB")
+
+    storage = field.storage
+    variants = {}
+    for width in VARIANT_WIDTHS:
+        width = min(width, image.width)
+        height = max(round(image.height * width / image.width), 1)
+
+        buffer = BytesIO()
+        image.resize((width, height), Image.LANCZOS).save(
+            buffer, "WEBP", quality=WEBP_QUALITY, method=6
+        )
+
+        # A file already at this name may belong to another record (or to a
+        # job that lost its lease); storage.save picks a free name instead
+        # of overwriting it
+        name = variant_name(field.name, width)
+        variants[str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+
+        if width == image.width:
+            break
+
+    return variants
+
+
+def delete_variants(storage, variants):
+    for name in variants.values():
+        storage.delete(name)
@@ -0,0 +1,191 @@
+import logging
+import random
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+DEFAULT_QUEUE = "default"
+
+# A running job whose lease is older than this is assumed to belong to a
+# dead worker and is put back on the queue. Live workers renew the leases
+# of their jobs every HEARTBEAT_INTERVAL, so long tasks keep theirs.
+LEASE_TIMEOUT = timedelta(minutes=15)
+HEARTBEAT_INTERVAL = 60  # seconds
+
+BACKOFF_BASE = 10  # seconds
+BACKOFF_MAX = 60 * 60
+
+
+# ---------------------- TASK REGISTRY ----------------------
+def task(name):
+    """Register a function as a job task under the given name."""
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+# ---------------------- ENQUEUE ----------------------
+def enqueue(task_name, payload=None, queue=DEFAULT_QUEUE, delay=0, max_attempts=5):
+    """
+    Store a job for the worker. Called inside the caller's transaction, so
+    the job only becomes visible if the surrounding change commits.
+    """
+    if task_name not in TASKS:
+        raise ValueError(f"Unknown task: {task_name}")
+
+    return Job.objects.create(
+        queue=queue,
+        task=task_name,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+# ---------------------- CLAIM ----------------------
+def claim(worker_id, limit, queue=DEFAULT_QUEUE):
+    """
+    Lease up to `limit` due jobs to this worker.
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+    so concurrent workers never block on or double-claim the same rows.
+    The conditional UPDATE with a per-claim token keeps this safe on
+    backends without row locks (SQLite).
+    """
+    now = timezone.now()
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(queue=queue, status="queued", run_at__lte=now)
+            .order_by("run_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+
+        Job.objects.filter(id__in=ids, status="queued").update(
+            status="running",
+            locked_by=token,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+
+    return list(Job.objects.filter(locked_by=token, status="running"))
+
+
+def heartbeat(tokens):
+    """Renew the leases of jobs this worker is still running."""
+    if not tokens:
+        return 0
+    return Job.objects.filter(status="running", locked_by__in=tokens).update(locked_at=timezone.now())
+
+
+def requeue_stale(queue=DEFAULT_QUEUE, timeout=LEASE_TIMEOUT):
+    """
+    Put jobs of dead workers back on the queue. A job that has used up its
+    attempts (e.g. because it keeps killing its worker) is failed instead.
+    """
+    stale = Job.objects.filter(
+        queue=queue, status="running", locked_at__lt=timezone.now() - timeout
+    )
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status="failed", locked_by="", locked_at=None,
+        last_error="Lease expired: the worker running this job stopped responding.",
+    )
+    return stale.update(status="queued", locked_by="", locked_at=None)
+
+
+# ---------------------- EXECUTE ----------------------
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 2)
+
+
+def execute(job_id, token):
+    """
+    Run one claimed job and record the outcome. Returns a dict of timing
+    metrics for the worker.
+
+    Every write is conditional on the claim token: if the lease was lost
+    and the job claimed again elsewhere, the outcome here is dropped
+    rather than clobbering the new owner's lease.
+    """
+    job = Job.objects.filter(id=job_id, status="running", locked_by=token).first()
+    if job is None:
+        return {"status": "missing"}
+    owned = Job.objects.filter(id=job.id, locked_by=token)
+
+    started = timezone.now()
+    wait = (started - job.run_at).total_seconds()
+    clock = time.monotonic()
+
+    try:
+        TASKS[job.task](**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed", job.id, job.task)
+
+        if job.attempts < job.max_attempts:
+            owned.update(
+                status="queued",
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+                run_at=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+            )
+            status = "retried"
+        else:
+            owned.update(status="failed", locked_by="", locked_at=None, last_error=error)
+            status = "failed"
+    else:
+        owned.delete()
+        status = "done"
+
+    return {"status": status, "wait": wait, "duration": time.monotonic() - clock}
+
+
+def execute_in_worker(job_id, token):
+    """
+    Pool entry point: module-level so it can be sent to a process pool,
+    and drops stale connections around the job so long-lived pool
+    threads/processes never reuse a broken one.
+    """
+    close_old_connections()
+    try:
+        return execute(job_id, token)
+    finally:
+        close_old_connections()
+
+
+# ---------------------- METRICS ----------------------
+def queue_stats(queue=DEFAULT_QUEUE):
+    now = timezone.now()
+    jobs = Job.objects.filter(queue=queue)
+
+    counts = dict(
+        jobs.order_by().values_list("status").annotate(total=Count("id"))
+    )
+    oldest_due = jobs.filter(status="queued", run_at__lte=now).aggregate(oldest=Min("run_at"))["oldest"]
+
+    return {
+        "queued": counts.get("queued", 0),
+        "running": counts.get("running", 0),
+        "failed": counts.get("failed", 0),
+        "due": jobs.filter(status="queued", run_at__lte=now).count(),
+        "oldest_due_seconds": (now - oldest_due).total_seconds() if oldest_due else 0.0,
+    }
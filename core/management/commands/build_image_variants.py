@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Department
+from core.tasks import department_image_variants
+
+
+class Command(BaseCommand):
+    help = "Generate the WebP size variants for department images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Regenerate variants for every department image.",
+        )
+
+    def handle(self, *args, **options):
+        departments = Department.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["force"]:
+            departments = departments.filter(image_variants={})
+
+        for department in departments:
+            department_image_variants(department.id)
+            self.stdout.write(f"{department.name}: done")
+
+        self.stdout.write(self.style.SUCCESS("Image variants built."))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.blobs import collect_blob, recount_references, store_file
+from core.models import Resource, StoredFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Move legacy resource files into deduplicated storage, recompute blob "
+        "reference counts and delete blobs nothing references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-legacy", action="store_true",
+            help="Do not hash and migrate resources that predate deduplication.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["skip_legacy"]:
+            self.migrate_legacy()
+
+        recount_references()
+
+        collected = sum(
+            collect_blob(blob_id)
+            for blob_id in StoredFile.objects.filter(ref_count=0).values_list("id", flat=True)
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {collected} unreferenced blobs."))
+
+    def migrate_legacy(self):
+        legacy = Resource.objects.filter(blob__isnull=True).exclude(Q(file="") | Q(file__isnull=True))
+        moved = 0
+
+        for resource in legacy.iterator():
+            old = resource.file
+            if not old.storage.exists(old.name):
+                self.stderr.write(f"resource {resource.id}: missing file {old.name}")
+                continue
+
+            old_name = old.name
+            with old.open("rb"):
+                blob = store_file(old, old_name)
+
+            # queryset update: the file is already stored, skip the save hooks
+            Resource.objects.filter(id=resource.id).update(blob=blob, file=blob.file.name)
+            moved += 1
+
+            if not Resource.objects.filter(file=old_name).exists():
+                old.storage.delete(old_name)
+
+        self.stdout.write(f"Moved {moved} legacy files into deduplicated storage.")
@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import (
+    Department,
+    Subject,
+    Resource,
+    ApprovedUploader,
+    TutorialSuggestion,
+    Bookmark,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN plans for the queries behind the main views. With --seed, "
+        "a large synthetic dataset is inserted first and rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Number of resources to insert before explaining (rolled back).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    self.seed(options["seed"], options["batch_size"])
+                self.explain_all()
+                raise Rollback
+        except Rollback:
+            pass
+
+    # ---------------------- SEED ----------------------
+    def seed(self, count, batch_size):
+        self.stdout.write(f"Seeding {count} resources...")
+
+        users = User.objects.bulk_create(
+            User(username=f"explain_user_{i}") for i in range(max(count // 100, 10))
+        )
+        departments = Department.objects.bulk_create(
+            Department(name=f"Explain Department {i}") for i in range(10)
+        )
+        subjects = Subject.objects.bulk_create(
+            Subject(department=departments[i % len(departments)], name=f"Explain Subject {i}", semester=i % 8 + 1)
+            for i in range(max(count // 1000, 20))
+        )
+
+        types = [resource_type for resource_type, _ in Resource.RESOURCE_TYPES]
+        statuses = ["approved"] * 18 + ["pending", "rejected"]
+        for start in range(0, count, batch_size):
+            Resource.objects.bulk_create(
+                Resource(
+                    subject=subjects[i % len(subjects)],
+                    title=f"Explain Resource {i}",
+                    file="resources/explain.pdf",
+                    resource_type=types[i % len(types)],
+                    uploaded_by=users[i % len(users)],
+                    status=statuses[i % len(statuses)],
+                )
+                for i in range(start, min(start + batch_size, count))
+            )
+
+        TutorialSuggestion.objects.bulk_create(
+            TutorialSuggestion(
+                subject=subjects[i % len(subjects)],
+                title=f"Explain Tutorial {i}",
+                link="https://example.com",
+                added_by=users[i % len(users)],
+            )
+            for i in range(count // 10)
+        )
+        ApprovedUploader.objects.bulk_create(
+            ApprovedUploader(student=user, is_active=i % 2 == 0) for i, user in enumerate(users)
+        )
+        resource_ids = list(Resource.objects.values_list("id", flat=True)[: len(users) * 10])
+        Bookmark.objects.bulk_create(
+            Bookmark(user=users[i % len(users)], resource_id=resource_id)
+            for i, resource_id in enumerate(resource_ids)
+        )
+
+        # Refresh planner statistics so the plans reflect the new row counts
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    # ---------------------- EXPLAIN ----------------------
+    def explain_all(self):
+        subject = Subject.objects.order_by("?").first()
+        user = User.objects.order_by("?").first()
+        if subject is None or user is None:
+            self.stderr.write("Nothing to explain: need at least one subject and one user (try --seed).")
+            return
+
+        queries = {
+            "subject_detail: resources": (
+                Resource.objects.filter(subject=subject, status="approved")
+                .select_related("uploaded_by")
+            ),
+            "subject_detail: tutorials": (
+                TutorialSuggestion.objects.filter(subject=subject).select_related("added_by")
+            ),
+            "subject_detail: bookmarks": (
+                Bookmark.objects.filter(user=user).values_list("resource_id", flat=True)
+            ),
+            "uploader status": (
+                ApprovedUploader.objects.filter(student=user, is_active=True)
+            ),
+            "review_uploads / dashboard: pending": (
+                Resource.objects.filter(status="pending").select_related("subject", "uploaded_by")
+            ),
+            "my_uploads": Resource.objects.filter(uploaded_by=user),
+            "my_bookmarks": Bookmark.objects.filter(user=user).select_related("resource"),
+        }
+
+        for label, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(queryset.explain())
+            self.stdout.write("")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.extraction import enqueue_pending
+
+
+class Command(BaseCommand):
+    help = "Queue text extraction for uploaded resources still waiting for it (run by runjobs)."
+
+    def handle(self, *args, **options):
+        queued = enqueue_pending()
+        self.stdout.write(f"Queued {len(queued)} extraction job(s); run `manage.py runjobs` to process them.")
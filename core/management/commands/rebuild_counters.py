@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard counters from the Department, Subject and Resource tables."
+
+    def handle(self, *args, **options):
+        counts = rebuild_counters()
+        for name, value in counts.items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters rebuilt."))
@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import jobs
+from core.pool import init_worker
+
+
+logger = logging.getLogger("core.worker")
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue (no external broker needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", default=jobs.DEFAULT_QUEUE)
+        parser.add_argument("--concurrency", type=int, default=4, help="Jobs run in parallel.")
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls when idle.")
+        parser.add_argument("--stats-interval", type=float, default=60.0, help="Seconds between metric reports.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is drained.")
+        parser.add_argument("--stats", action="store_true", help="Print queue metrics and exit.")
+
+    def handle(self, *args, **options):
+        queue = options["queue"]
+
+        if options["stats"]:
+            for name, value in jobs.queue_stats(queue).items():
+                self.stdout.write(f"{name}: {value}")
+            return
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        concurrency = max(1, options["concurrency"])
+
+        if options["pool"] == "process":
+            # Children must open their own connections, never inherit ours.
+            # Forked children would get a copy of every socket this process
+            # has open when the pool starts them (on the first submit, after
+            # we have already queried), so spawn fresh interpreters instead.
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(settings.DATABASES,),
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+
+        metrics = {"done": 0, "retried": 0, "failed": 0, "wait": 0.0, "duration": 0.0}
+        in_flight = {}  # future -> claim token
+        last_report = last_heartbeat = time.monotonic()
+
+        logger.info("Worker %s started on queue %r (%s x%d)", worker_id, queue, options["pool"], concurrency)
+
+        with executor:
+            while self.running or in_flight:
+                if self.running:
+                    jobs.requeue_stale(queue)
+                    free = concurrency - len(in_flight)
+                    claimed = jobs.claim(worker_id, free, queue) if free else []
+                    for job in claimed:
+                        in_flight[executor.submit(jobs.execute_in_worker, job.id, job.locked_by)] = job.locked_by
+
+                    if not claimed and not in_flight and options["once"]:
+                        break
+
+                if in_flight:
+                    finished, _ = wait(in_flight, timeout=options["interval"], return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        del in_flight[future]
+                        self.record(metrics, future)
+                elif self.running:
+                    time.sleep(options["interval"])
+
+                # Keep the leases of long-running jobs from expiring
+                if time.monotonic() - last_heartbeat >= jobs.HEARTBEAT_INTERVAL:
+                    jobs.heartbeat(set(in_flight.values()))
+                    last_heartbeat = time.monotonic()
+
+                if time.monotonic() - last_report >= options["stats_interval"]:
+                    self.report(queue, metrics)
+                    last_report = time.monotonic()
+
+        self.report(queue, metrics)
+        logger.info("Worker %s stopped", worker_id)
+
+    def stop(self, signum, frame):
+        logger.info("Received signal %s, finishing in-flight jobs", signum)
+        self.running = False
+
+    def record(self, metrics, future):
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception("Job execution crashed")
+            return
+
+        if result["status"] in metrics:
+            metrics[result["status"]] += 1
+            metrics["wait"] += result["wait"]
+            metrics["duration"] += result["duration"]
+
+    def report(self, queue, metrics):
+        processed = metrics["done"] + metrics["retried"] + metrics["failed"]
+        stats = jobs.queue_stats(queue)
+        logger.info(
+            "queue=%s depth=%d due=%d running=%d failed_total=%d oldest_due=%.1fs | "
+            "processed=%d done=%d retried=%d failed=%d avg_wait=%.2fs avg_run=%.2fs",
+            queue, stats["queued"], stats["due"], stats["running"], stats["failed"],
+            stats["oldest_due_seconds"], processed, metrics["done"], metrics["retried"],
+            metrics["failed"],
+            metrics["wait"] / processed if processed else 0.0,
+            metrics["duration"] / processed if processed else 0.0,
+        )
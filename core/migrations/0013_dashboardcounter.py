@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 05:04
+
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    Department = apps.get_model('core', 'Department')
+    Subject = apps.get_model('core', 'Subject')
+    Resource = apps.get_model('core', 'Resource')
+    DashboardCounter = apps.get_model('core', 'DashboardCounter')
+
+    counts = {
+        'departments': Department.objects.count(),
+        'subjects': Subject.objects.count(),
+        'resources': Resource.objects.count(),
+        'pending_resources': Resource.objects.filter(status='pending').count(),
+    }
+    DashboardCounter.objects.bulk_create(
+        DashboardCounter(name=name, value=value) for name, value in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_bookmark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('departments', 'Departments'), ('subjects', 'Subjects'), ('resources', 'Resources'), ('pending_resources', 'Pending Resources')], max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
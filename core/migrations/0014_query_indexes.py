@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 05:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_dashboardcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='approveduploader',
+            index=models.Index(fields=['student', 'is_active'], name='uploader_student_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['user', '-created_at'], name='bookmark_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['subject', 'status', '-uploaded_at'], name='resource_subject_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-uploaded_at'], name='resource_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['uploaded_by', '-uploaded_at'], name='resource_uploader_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorialsuggestion',
+            index=models.Index(fields=['subject', '-created_at'], name='tutorial_subject_created_idx'),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 6.0 on 2026-10-18 05:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX core_searchdocument_vector_idx ON core_searchdocument USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchdocument_vector_idx",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        title, body,
+        content='core_searchdocument', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def populate_search_documents(apps, schema_editor):
+    Resource = apps.get_model('core', 'Resource')
+    TutorialSuggestion = apps.get_model('core', 'TutorialSuggestion')
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+
+    documents = [
+        SearchDocument(
+            kind='resource', object_id=r.id, title=r.title, body=r.description or '',
+            resource_type=r.resource_type, subject_id=r.subject_id,
+            department_id=r.subject.department_id, semester=r.subject.semester,
+        )
+        for r in Resource.objects.filter(status='approved').select_related('subject')
+    ]
+    documents += [
+        SearchDocument(
+            kind='tutorial', object_id=t.id, title=t.title, body=t.description or '',
+            resource_type=t.resource_type, subject_id=t.subject_id,
+            department_id=t.subject.department_id, semester=t.subject.semester,
+        )
+        for t in TutorialSuggestion.objects.select_related('subject')
+    ]
+    SearchDocument.objects.bulk_create(documents, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('resource', 'Resource'), ('tutorial', 'Tutorial')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True, default='')),
+                ('semester', models.IntegerField()),
+                ('resource_type', models.CharField(max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='core.department')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='core.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'semester'], name='search_document_dept_sem_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_object_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_vendor_sql({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 6.0 on 2026-10-18 05:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def search_vector_sql(columns):
+    weights = {'title': 'A', 'body': 'B', 'content': 'C'}
+    expression = ' ||\n        '.join(
+        f"setweight(to_tsvector('english', coalesce({column}, '')), '{weights[column]}')"
+        for column in columns
+    )
+    return [
+        f"""
+        ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            {expression}
+        ) STORED
+        """,
+        "CREATE INDEX core_searchdocument_vector_idx ON core_searchdocument USING GIN (search_vector)",
+    ]
+
+
+def fts_sql(columns):
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+            {column_list},
+            content='core_searchdocument', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        f"""
+        CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(rowid, {column_list})
+            VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, {column_list})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, {column_list})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO core_searchdocument_fts(rowid, {column_list})
+            VALUES (new.id, {new_values});
+        END
+        """,
+        "INSERT INTO core_searchdocument_fts(core_searchdocument_fts) VALUES ('rebuild')",
+    ]
+
+
+DROP_FULLTEXT = {
+    'postgresql': [
+        "DROP INDEX IF EXISTS core_searchdocument_vector_idx",
+        "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+    ],
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS core_searchdocument_fts_ai",
+        "DROP TRIGGER IF EXISTS core_searchdocument_fts_ad",
+        "DROP TRIGGER IF EXISTS core_searchdocument_fts_au",
+        "DROP TABLE IF EXISTS core_searchdocument_fts",
+    ],
+}
+
+FULLTEXT_WITH_CONTENT = {
+    'postgresql': search_vector_sql(['title', 'body', 'content']),
+    'sqlite': fts_sql(['title', 'body', 'content']),
+}
+
+FULLTEXT_WITHOUT_CONTENT = {
+    'postgresql': search_vector_sql(['title', 'body']),
+    'sqlite': fts_sql(['title', 'body']),
+}
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_searchdocument'),
+    ]
+
+    operations = [
+        # The full-text index covers every column, so it is dropped around
+        # the schema change (SQLite also rebuilds the table on AddField).
+        migrations.RunPython(
+            run_vendor_sql(DROP_FULLTEXT),
+            run_vendor_sql(FULLTEXT_WITHOUT_CONTENT),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='content',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='ResourceContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('text', models.TextField(blank=True, default='')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+                ('resource', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='content', to='core.resource')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='content_pending_idx')],
+            },
+        ),
+        migrations.RunPython(
+            run_vendor_sql(FULLTEXT_WITH_CONTENT),
+            run_vendor_sql(DROP_FULLTEXT),
+        ),
+    ]
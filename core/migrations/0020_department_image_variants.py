@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
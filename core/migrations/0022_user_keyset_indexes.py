@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 09:40
+
+from django.db import migrations
+
+
+# Indexes behind the dashboard's keyset pagination. auth_user belongs to
+# django.contrib.auth, so they are created here in plain SQL; expression
+# indexes use the same syntax on PostgreSQL and SQLite.
+FORWARD = [
+    'CREATE INDEX IF NOT EXISTS core_user_name_keyset_idx ON auth_user (LOWER(first_name), LOWER(last_name), id)',
+    'CREATE INDEX IF NOT EXISTS core_user_joined_keyset_idx ON auth_user (date_joined, id)',
+]
+
+BACKWARD = [
+    'DROP INDEX IF EXISTS core_user_name_keyset_idx',
+    'DROP INDEX IF EXISTS core_user_joined_keyset_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0021_resource_review_claim'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD, BACKWARD),
+    ]
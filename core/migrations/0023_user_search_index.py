@@ -0,0 +1,72 @@
+from django.db import migrations
+
+
+SEARCH_TEXT = "LOWER(username || ' ' || first_name || ' ' || last_name || ' ' || email)"
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS core_user_search_trgm_idx ON auth_user USING GIN (({SEARCH_TEXT}) gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_user_search_trgm_idx",
+]
+
+# Contentless trigram table: it only maps search text to auth_user rowids
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_user_fts USING fts5(
+        search_text, content='', tokenize='trigram'
+    )
+    """,
+    f"INSERT INTO core_user_fts(rowid, search_text) SELECT id, {SEARCH_TEXT} FROM auth_user",
+    """
+    CREATE TRIGGER core_user_fts_ai AFTER INSERT ON auth_user BEGIN
+        INSERT INTO core_user_fts(rowid, search_text)
+        VALUES (new.id, LOWER(new.username || ' ' || new.first_name || ' ' || new.last_name || ' ' || new.email));
+    END
+    """,
+    """
+    CREATE TRIGGER core_user_fts_ad AFTER DELETE ON auth_user BEGIN
+        INSERT INTO core_user_fts(core_user_fts, rowid, search_text)
+        VALUES ('delete', old.id, LOWER(old.username || ' ' || old.first_name || ' ' || old.last_name || ' ' || old.email));
+    END
+    """,
+    """
+    CREATE TRIGGER core_user_fts_au AFTER UPDATE OF username, first_name, last_name, email ON auth_user BEGIN
+        INSERT INTO core_user_fts(core_user_fts, rowid, search_text)
+        VALUES ('delete', old.id, LOWER(old.username || ' ' || old.first_name || ' ' || old.last_name || ' ' || old.email));
+        INSERT INTO core_user_fts(rowid, search_text)
+        VALUES (new.id, LOWER(new.username || ' ' || new.first_name || ' ' || new.last_name || ' ' || new.email));
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_user_fts_ai",
+    "DROP TRIGGER IF EXISTS core_user_fts_ad",
+    "DROP TRIGGER IF EXISTS core_user_fts_au",
+    "DROP TABLE IF EXISTS core_user_fts",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0022_user_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_vendor_sql({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
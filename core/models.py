@@ -1,4 +1,9 @@
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
+from django.urls import reverse
 from django.contrib.auth.models import User
 
 
@@ -7,6 +12,8 @@ class Department(models.Model):
     name = models.CharField(max_length=200, unique=True)
     description = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to="department_images/", blank=True, null=True)
+    # {width: storage name} of the WebP copies made by core.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         ordering = ["name"]
@@ -14,6 +21,33 @@ class Department(models.Model):
     def __str__(self):
         return self.name
 
+    def image_variant_url(self, width):
+        """URL of the smallest variant at least `width` wide (or the widest)."""
+        if not self.image:
+            return ""
+        if not self.image_variants:
+            return self.image.url
+
+        widths = sorted(int(w) for w in self.image_variants)
+        chosen = next((w for w in widths if w >= width), widths[-1])
+        return self.image.storage.url(self.image_variants[str(chosen)])
+
+    @property
+    def image_srcset(self):
+        storage = self.image.storage
+        return ", ".join(
+            f"{storage.url(name)} {width}w"
+            for width, name in sorted(self.image_variants.items(), key=lambda item: int(item[0]))
+        )
+
+    @property
+    def image_thumbnail_url(self):
+        return self.image_variant_url(0)
+
+    @property
+    def image_card_url(self):
+        return self.image_variant_url(480)
+
 
 # ---------------------- SUBJECT ----------------------
 class Subject(models.Model):
@@ -31,6 +65,29 @@ class Subject(models.Model):
         return f"{self.name} (Sem {self.semester})"
 
 
+# ---------------------- STORED FILE (CONTENT-ADDRESSED BLOB) ----------------------
+def blob_path(instance, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    sha = instance.sha256
+    return f"blobs/{sha[:2]}/{sha[2:4]}/{sha}{extension}"
+
+
+class StoredFile(models.Model):
+    """
+    A single copy of an uploaded file, stored under its SHA-256 and shared
+    by every Resource with the same content (see core.blobs).
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=blob_path, max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
 # ---------------------- RESOURCE (NOTES / PYQ / FACULTY NOTES) ----------------------
 class Resource(models.Model):
 
@@ -51,7 +108,11 @@ class Resource(models.Model):
         Subject, on_delete=models.CASCADE, related_name="resources"
     )
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to='resources/')
+    file = models.FileField(upload_to='resources/', max_length=255)
+    blob = models.ForeignKey(
+        StoredFile, on_delete=models.PROTECT, null=True, blank=True,
+        related_name="resources"
+    )
     resource_type = models.CharField(max_length=20, choices=RESOURCE_TYPES)
     description = models.TextField(blank=True, null=True)
 
@@ -62,12 +123,82 @@ class Resource(models.Model):
         max_length=20, choices=STATUS_CHOICES, default='pending'
     )
 
+    # Review lease: the faculty member currently holding this pending
+    # upload in their review slice, and since when (see core.review)
+    claimed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="review_claims", editable=False
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ["-uploaded_at"]
+        indexes = [
+            # subject page: approved resources of a subject, newest first
+            models.Index(
+                fields=["subject", "status", "-uploaded_at"],
+                name="resource_subject_status_idx",
+            ),
+            # review queue / dashboard: only the (small) pending slice
+            models.Index(
+                fields=["-uploaded_at"],
+                condition=models.Q(status="pending"),
+                name="resource_pending_idx",
+            ),
+            # my uploads
+            models.Index(
+                fields=["uploaded_by", "-uploaded_at"],
+                name="resource_uploader_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def download_url(self):
+        # The blob id changes whenever the content does, so it versions the
+        # URL and lets browsers cache each version indefinitely
+        url = reverse("download_resource", args=[self.id])
+        return f"{url}?v={self.blob_id}" if self.blob_id else url
+
+
+# ---------------------- EXTRACTED RESOURCE CONTENT ----------------------
+class ResourceContent(models.Model):
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    ]
+
+    resource = models.OneToOneField(
+        Resource, on_delete=models.CASCADE, related_name="content"
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='pending'
+    )
+    text = models.TextField(blank=True, default="")
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status="pending"),
+                name="content_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Content of {self.resource_id} ({self.status})"
+
 
 # ---------------------- STUDENT APPROVAL FOR UPLOADS ----------------------
 class ApprovedUploader(models.Model):
@@ -82,6 +213,12 @@ class ApprovedUploader(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["student", "is_active"],
+                name="uploader_student_active_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Uploader: {self.student.username}"
@@ -113,12 +250,31 @@ class TutorialSuggestion(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["subject", "-created_at"],
+                name="tutorial_subject_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
     
     
 # ---------------------- BOOKMARK ----------------------
+class BookmarkQuerySet(models.QuerySet):
+
+    def delete(self):
+        # Bookmarks have no delete receivers (see core.signals), so the
+        # owners' bookmark stamps are bumped here
+        from .fragments import bump_version
+
+        user_ids = set(self.order_by().values_list("user_id", flat=True).distinct())
+        deleted = super().delete()
+        bump_version("bookmarks", *user_ids)
+        return deleted
+
+
 class Bookmark(models.Model):
     user = models.ForeignKey(
         User,
@@ -132,10 +288,206 @@ class Bookmark(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BookmarkQuerySet.as_manager()
+
     class Meta:
         unique_together = ("user", "resource")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="bookmark_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} bookmarked {self.resource.title}"
 
+    def delete(self, *args, **kwargs):
+        from .fragments import bump_version
+
+        deleted = super().delete(*args, **kwargs)
+        bump_version("bookmarks", self.user_id)
+        return deleted
+
+
+
+# ---------------------- DASHBOARD COUNTERS ----------------------
+class DashboardCounter(models.Model):
+
+    DEPARTMENTS = "departments"
+    SUBJECTS = "subjects"
+    RESOURCES = "resources"
+    PENDING_RESOURCES = "pending_resources"
+
+    NAMES = [
+        (DEPARTMENTS, "Departments"),
+        (SUBJECTS, "Subjects"),
+        (RESOURCES, "Resources"),
+        (PENDING_RESOURCES, "Pending Resources"),
+    ]
+
+    name = models.CharField(max_length=50, choices=NAMES, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+# ---------------------- SEARCH DOCUMENT ----------------------
+class SearchDocument(models.Model):
+    """
+    Denormalized, searchable copy of an approved Resource or a
+    TutorialSuggestion, kept in sync by signals (see core.search).
+
+    The full-text index lives outside the ORM: a stored tsvector column
+    with a GIN index on PostgreSQL, an FTS5 table on SQLite.
+    """
+
+    KIND_RESOURCE = "resource"
+    KIND_TUTORIAL = "tutorial"
+
+    KINDS = [
+        (KIND_RESOURCE, "Resource"),
+        (KIND_TUTORIAL, "Tutorial"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.BigIntegerField()
+
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True, default="")
+    content = models.TextField(blank=True, default="")
+
+    subject = models.ForeignKey(
+        Subject, on_delete=models.CASCADE, related_name="search_documents"
+    )
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, related_name="search_documents"
+    )
+    semester = models.IntegerField()
+    resource_type = models.CharField(max_length=20)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="search_document_object_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["department", "semester"], name="search_document_dept_sem_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
+# ---------------------- BACKGROUND JOB ----------------------
+class Job(models.Model):
+    """
+    A unit of deferred work, stored in the main database and executed by
+    'manage.py runjobs' (see core.jobs). Finished jobs are deleted;
+    failed ones are kept for inspection.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='queued'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True, default="")
+
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["run_at"]
+        indexes = [
+            # claim: due jobs of a queue, oldest first
+            models.Index(
+                fields=["queue", "run_at"],
+                condition=models.Q(status="queued"),
+                name="job_queued_idx",
+            ),
+            # stale lease recovery
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="job_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
+
+
+# ---------------------- CHUNKED UPLOAD SESSION ----------------------
+class UploadSession(models.Model):
+    """
+    A resumable upload in progress: chunks are appended to a file in
+    CHUNKED_UPLOAD_DIR until `offset` reaches `size` (see core.chunked).
+    """
+
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+        ('expired', 'Expired'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    offset = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default="")
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='active'
+    )
+    resource = models.ForeignKey(
+        Resource, on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+# ---------------------- VERSION STAMP ----------------------
+class VersionStamp(models.Model):
+    """
+    Version of a subject or department page, or of a user's bookmarks (see
+    core.fragments). Kept in the database so every web worker and the job
+    runner agree on it, whatever cache backend each one uses.
+    """
+
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key}: {self.version:x}"
@@ -0,0 +1,44 @@
+from django.db import transaction
+
+from .counters import bump
+from .fragments import bump_version
+from .models import DashboardCounter, Resource
+from .search import index_resources
+
+
+MODERATION_STATUSES = ("approved", "rejected")
+
+
+def moderate(queryset, status):
+    """
+    Approve or reject every pending resource in `queryset` with a single
+    UPDATE ... WHERE status = 'pending', and return how many rows changed.
+
+    Queryset updates bypass the Resource signals, so the side effects they
+    would have had (pending counter, search index, subject page versions)
+    are applied here in bulk.
+    """
+    if status not in MODERATION_STATUSES:
+        raise ValueError(f"Unknown moderation status: {status}")
+
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(status="pending")
+            .select_for_update()
+            .order_by()
+            .values_list("id", "subject_id")
+        )
+        if not rows:
+            return 0
+
+        ids = [resource_id for resource_id, _ in rows]
+        # Re-checking the status keeps a concurrent moderator's decision
+        # (on backends without row locks) and makes the count exact
+        updated = Resource.objects.filter(id__in=ids, status="pending").update(status=status)
+
+        bump(DashboardCounter.PENDING_RESOURCES, -updated)
+        if status == "approved":
+            index_resources(ids)
+        bump_version("subject", *{subject_id for _, subject_id in rows})
+
+    return updated
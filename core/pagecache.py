@@ -0,0 +1,95 @@
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .fragments import bump_version, get_version
+
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# How long a worker trusts its cached copy of a page's version stamp. The
+# worker that invalidates sees the change at once; others within this.
+PAGE_VERSION_TIMEOUT = 5
+
+
+def page_cache_key(name, version):
+    return f"core:page:{name}:{version}"
+
+
+def page_version_key(name):
+    return f"core:pageversion:{name}"
+
+
+def page_version(name, request=None):
+    key = page_version_key(name)
+    version = cache.get(key)
+    if version is None:
+        version = get_version("page", name, request, create=True)
+        cache.set(key, version, PAGE_VERSION_TIMEOUT)
+    return version
+
+
+def is_anonymous_request(request):
+    """
+    True for GET/HEAD requests that carry no session or messages cookie.
+    Such visitors are anonymous without touching the session store, and
+    see exactly the same page as every other anonymous visitor.
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+        and not request.GET
+    )
+
+
+# ---------------------- DECORATOR ----------------------
+def anonymous_page_cache(name, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Cache the rendered page for anonymous visitors under `name`. A hit is
+    served straight from the cache: no ORM queries (the version stamp is
+    cached briefly too), no template rendering. Logged-in users always get
+    a fresh render. Invalidate with invalidate_page(name).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not is_anonymous_request(request):
+                return view(request, *args, **kwargs)
+
+            key = page_cache_key(name, page_version(name, request))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view(request, *args, **kwargs)
+                # Anything that set a cookie is specific to this visitor and
+                # must not be shared. A page that used a CSRF token counts
+                # too: CsrfViewMiddleware only sets that cookie after we return.
+                if (
+                    response.status_code == 200
+                    and not response.streaming
+                    and not response.cookies
+                    and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+                ):
+                    cache.set(key, (response.content, response["Content-Type"]), timeout)
+
+            # Downstream caches must not hand this page to logged-in users
+            patch_vary_headers(response, ("Cookie",))
+            return response
+        return wrapped
+    return decorator
+
+
+def invalidate_page(*names):
+    # Bumps the stamp in the database rather than deleting cache entries,
+    # so it reaches every worker's cache, also from runjobs. Applied on
+    # commit, like bump_version.
+    bump_version("page", *names)
+    transaction.on_commit(lambda: cache.delete_many([page_version_key(name) for name in names]))
@@ -0,0 +1,143 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Q
+
+
+# ---------------------- CURSORS ----------------------
+def encode_cursor(direction, values):
+    raw = json.dumps({"d": direction, "v": [str(value) for value in values]}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    Cursor back to (direction, typed values), or None if it is not valid.
+    Values for model fields are converted back with the field; annotated
+    sort keys (e.g. Lower("first_name")) stay strings.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        direction, values = data["d"], data["v"]
+        if direction not in ("next", "prev") or len(values) != len(ordering):
+            return None
+
+        typed = []
+        for field, value in zip(ordering, values):
+            try:
+                typed.append(model._meta.get_field(field.lstrip("-")).to_python(value))
+            except FieldDoesNotExist:
+                typed.append(value)
+        return direction, typed
+    except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+        return None
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+
+def after_condition(ordering, values):
+    """
+    Rows strictly after `values` in `ordering`, e.g. for ("-uploaded_at", "-id"):
+    uploaded_at < t OR (uploaded_at = t AND id < i).
+
+    The redundant uploaded_at <= t in front gives the planner a range to
+    seek to on the leading index column instead of scanning for the OR.
+    """
+    lead = ordering[0]
+    bound = "lte" if lead.startswith("-") else "gte"
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        step = Q(**{f"{name}__{lookup}": values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return Q(**{f"{lead.lstrip('-')}__{bound}": values[0]}) & condition
+
+
+# ---------------------- KEYSET PAGINATION ----------------------
+class KeysetPage:
+
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_page(queryset, ordering, cursor=None, per_page=20):
+    """
+    One page of `queryset` ordered by `ordering`, which must end in a
+    unique field (normally "id" / "-id"). Ordering by an expression needs
+    it annotated first and named here. Unlike OFFSET pagination the cost
+    does not grow with the page number, there is no COUNT(*), and rows
+    inserted meanwhile never shift items between pages.
+    """
+    ordering = tuple(ordering)
+    direction, values = "next", None
+    if cursor:
+        decoded = decode_cursor(cursor, queryset.model, ordering)
+        if decoded is not None:
+            direction, values = decoded
+
+    walk = ordering if direction == "next" else reverse_ordering(ordering)
+    rows = queryset.order_by(*walk)
+    if values is not None:
+        rows = rows.filter(after_condition(walk, values))
+
+    items = list(rows[: per_page + 1])
+    more = len(items) > per_page
+    items = items[:per_page]
+
+    if direction == "next":
+        has_next, has_previous = more, values is not None
+    else:
+        items.reverse()
+        has_next, has_previous = True, more
+
+    def key(item):
+        return [getattr(item, field.lstrip("-")) for field in ordering]
+
+    return KeysetPage(
+        items,
+        encode_cursor("next", key(items[-1])) if items and has_next else None,
+        encode_cursor("prev", key(items[0])) if items and has_previous else None,
+    )
+
+
+# ---------------------- COUNTS ----------------------
+def estimated_count(model):
+    """
+    Planner's row estimate for a whole table on PostgreSQL (free, kept
+    fresh by autovacuum); an exact COUNT(*) elsewhere.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return model._default_manager.count()
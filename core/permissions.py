@@ -0,0 +1,36 @@
+from django.core.cache import cache
+
+from .fragments import get_version
+from .models import ApprovedUploader
+
+
+UPLOADER_CACHE_TIMEOUT = 60 * 15
+
+
+def uploader_cache_key(user_id, version):
+    return f"core:approved_uploader:{user_id}:{version}"
+
+
+# ---------------------- APPROVED UPLOADER LOOKUP ----------------------
+def is_approved_uploader(request):
+    """
+    Whether the requesting user holds an active ApprovedUploader entry.
+
+    Resolved at most once per request (memoized on the request object) and
+    backed by a cross-request cache keyed by user id and the user's
+    "uploader" version stamp. The stamp lives in the database and is bumped
+    whenever their entry changes, so a revocation reaches every worker.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return False
+
+    if not hasattr(request, "_approved_uploader"):
+        key = uploader_cache_key(user.id, get_version("uploader", user.id, request, create=True))
+        status = cache.get(key)
+        if status is None:
+            status = ApprovedUploader.objects.filter(student=user, is_active=True).exists()
+            cache.set(key, status, UPLOADER_CACHE_TIMEOUT)
+        request._approved_uploader = status
+
+    return request._approved_uploader
@@ -0,0 +1,17 @@
+import django
+
+
+def init_worker(databases):
+    """
+    Process pool initializer for runjobs. Pool processes are spawned rather
+    than forked, so they never inherit the parent's database sockets; each
+    sets Django up afresh against the parent's databases (which the test
+    runner, for one, renames at runtime).
+
+    Kept apart from core.jobs: this module is imported in the child before
+    Django is set up, so it must not import any models.
+    """
+    from django.conf import settings
+
+    settings.DATABASES.update(databases)
+    django.setup()
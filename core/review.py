@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Resource
+
+
+# Uploads handed to a reviewer at a time
+CLAIM_BATCH = 10
+
+# A claim not renewed within this window (the reviewer closed the tab or
+# went home) expires and the uploads go back to the shared pool
+LEASE_TIMEOUT = timedelta(minutes=20)
+
+
+def unclaimed(now):
+    return Q(claimed_by__isnull=True) | Q(claimed_at__lt=now - LEASE_TIMEOUT)
+
+
+# ---------------------- CLAIM ----------------------
+def claim_reviews(reviewer, limit=CLAIM_BATCH, subject_id=None):
+    """
+    Renew the reviewer's current claims and top their slice up to `limit`
+    pending uploads, oldest first. With `subject_id` only that subject's
+    uploads are renewed and claimed; claims elsewhere lapse with their
+    lease.
+
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+    so reviewers claiming at the same moment never block each other or get
+    the same uploads. The conditional UPDATE keeps this safe on backends
+    without row locks (SQLite), as in core.jobs.claim.
+    """
+    now = timezone.now()
+    scope = Q(subject_id=subject_id) if subject_id else Q()
+
+    with transaction.atomic():
+        held = Resource.objects.filter(
+            scope, status="pending", claimed_by=reviewer, claimed_at__gte=now - LEASE_TIMEOUT
+        ).update(claimed_at=now)
+
+        if held < limit:
+            ids = list(
+                Resource.objects.select_for_update(skip_locked=True)
+                .filter(scope, unclaimed(now), status="pending")
+                .order_by("uploaded_at", "id")
+                .values_list("id", flat=True)[: limit - held]
+            )
+            if ids:
+                Resource.objects.filter(unclaimed(now), id__in=ids, status="pending").update(
+                    claimed_by=reviewer, claimed_at=now
+                )
+
+    return claimed_by(reviewer).filter(scope)
+
+
+def claimed_by(reviewer):
+    return (
+        Resource.objects.filter(
+            status="pending", claimed_by=reviewer,
+            claimed_at__gte=timezone.now() - LEASE_TIMEOUT,
+        )
+        .select_related("subject", "uploaded_by")
+        .order_by("uploaded_at", "id")
+    )
+
+
+def release_reviews(reviewer):
+    return Resource.objects.filter(status="pending", claimed_by=reviewer).update(
+        claimed_by=None, claimed_at=None
+    )
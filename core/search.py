@@ -0,0 +1,206 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+
+from .models import Resource, ResourceContent, TutorialSuggestion, SearchDocument
+
+
+FTS_TABLE = "core_searchdocument_fts"
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# Extracted file text beyond this is not indexed (tsvector values are
+# capped at 1 MB on PostgreSQL)
+MAX_INDEXED_CHARS = 200_000
+
+
+# ---------------------- INDEXING ----------------------
+def index_resource(resource):
+    if resource.status != "approved":
+        unindex(SearchDocument.KIND_RESOURCE, resource.id)
+        return
+
+    subject = resource.subject
+    content = (
+        ResourceContent.objects.filter(resource=resource, status="done")
+        .values_list("text", flat=True)
+        .first()
+    )
+    SearchDocument.objects.update_or_create(
+        kind=SearchDocument.KIND_RESOURCE,
+        object_id=resource.id,
+        defaults={
+            "title": resource.title,
+            "body": resource.description or "",
+            "content": (content or "")[:MAX_INDEXED_CHARS],
+            "resource_type": resource.resource_type,
+            "subject": subject,
+            "department_id": subject.department_id,
+            "semester": subject.semester,
+        },
+    )
+
+
+def index_tutorial(tutorial):
+    subject = tutorial.subject
+    SearchDocument.objects.update_or_create(
+        kind=SearchDocument.KIND_TUTORIAL,
+        object_id=tutorial.id,
+        defaults={
+            "title": tutorial.title,
+            "body": tutorial.description or "",
+            "resource_type": tutorial.resource_type,
+            "subject": subject,
+            "department_id": subject.department_id,
+            "semester": subject.semester,
+        },
+    )
+
+
+def index_resource_content(resource_id, text):
+    SearchDocument.objects.filter(
+        kind=SearchDocument.KIND_RESOURCE, object_id=resource_id
+    ).update(content=text[:MAX_INDEXED_CHARS])
+
+
+def unindex(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def reindex_subject(subject):
+    SearchDocument.objects.filter(subject=subject).update(
+        department_id=subject.department_id, semester=subject.semester
+    )
+
+
+def approved_resources_for_index():
+    return (
+        Resource.objects.filter(status="approved")
+        .select_related("subject")
+        .annotate(extracted_text=Subquery(
+            ResourceContent.objects.filter(resource=OuterRef("pk"), status="done")
+            .values("text")
+        ))
+        .order_by()
+    )
+
+
+def resource_document(r):
+    return SearchDocument(
+        kind=SearchDocument.KIND_RESOURCE, object_id=r.id,
+        title=r.title, body=r.description or "", resource_type=r.resource_type,
+        content=(r.extracted_text or "")[:MAX_INDEXED_CHARS],
+        subject=r.subject, department_id=r.subject.department_id,
+        semester=r.subject.semester,
+    )
+
+
+def index_resources(resource_ids, batch_size=2000):
+    """
+    Bulk version of index_resource for rows changed by a queryset update
+    (which sends no signals): one query to read, one delete, batched inserts.
+    """
+    resources = approved_resources_for_index().filter(id__in=resource_ids)
+    documents = [resource_document(r) for r in resources]
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(
+            kind=SearchDocument.KIND_RESOURCE, object_id__in=resource_ids
+        ).delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+
+
+def rebuild_search_index(batch_size=2000):
+    """Drop and rebuild every search document from the source tables."""
+    def documents():
+        for r in approved_resources_for_index().iterator(chunk_size=batch_size):
+            yield resource_document(r)
+
+        tutorials = TutorialSuggestion.objects.select_related("subject").order_by()
+        for t in tutorials.iterator(chunk_size=batch_size):
+            yield SearchDocument(
+                kind=SearchDocument.KIND_TUTORIAL, object_id=t.id,
+                title=t.title, body=t.description or "", resource_type=t.resource_type,
+                subject=t.subject, department_id=t.subject.department_id,
+                semester=t.subject.semester,
+            )
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        batch = []
+        total = 0
+        for document in documents():
+            batch.append(document)
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        total += len(batch)
+
+    return total
+
+
+# ---------------------- QUERYING ----------------------
+def search(query, department=None, semester=None, resource_type=None, limit=DEFAULT_LIMIT):
+    """
+    Ranked full-text search over approved resources and tutorials.
+
+    Uses the stored tsvector column on PostgreSQL and the FTS5 table on
+    SQLite; other backends fall back to a plain icontains filter.
+    """
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        return SearchDocument.objects.none()
+
+    documents = SearchDocument.objects.select_related("subject").defer("body", "content")
+
+    if department:
+        documents = documents.filter(department_id=department)
+    if semester:
+        documents = documents.filter(semester=semester)
+    if resource_type:
+        documents = documents.filter(resource_type=resource_type)
+
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery('english', %s)"
+        documents = documents.filter(
+            RawSQL(f"search_vector @@ {tsquery}", (query,), output_field=BooleanField())
+        ).annotate(
+            rank=RawSQL(f"ts_rank_cd(search_vector, {tsquery})", (query,), output_field=FloatField())
+        ).order_by("-rank", "-updated_at")
+
+    elif vendor == "sqlite":
+        # Quote every term so user input can never be parsed as FTS5 syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        documents = documents.filter(
+            RawSQL(
+                f"core_searchdocument.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+                (match,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            # bm25() is "lower is better"; title hits weigh more than
+            # description hits, which weigh more than file-content hits
+            rank=RawSQL(
+                f"(SELECT bm25({FTS_TABLE}, 10.0, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = core_searchdocument.id)",
+                (match,),
+                output_field=FloatField(),
+            )
+        ).order_by("rank", "-updated_at")
+
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term) | Q(body__icontains=term) | Q(content__icontains=term)
+            )
+        documents = documents.filter(condition).order_by("-updated_at")
+
+    return documents[:limit]
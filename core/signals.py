@@ -0,0 +1,288 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .blobs import store_file, add_reference, drop_reference
+from .counters import bump
+from .extraction import schedule_extraction
+from .fragments import bump_version
+from .images import delete_variants
+from .jobs import enqueue
+from .models import (
+    Department,
+    Subject,
+    Resource,
+    ApprovedUploader,
+    TutorialSuggestion,
+    Bookmark,
+    DashboardCounter,
+    SearchDocument,
+)
+from .pagecache import invalidate_page
+from .search import index_resource, index_tutorial, unindex, reindex_subject
+
+
+# ---------------------- APPROVED UPLOADER ----------------------
+@receiver(post_save, sender=ApprovedUploader)
+@receiver(post_delete, sender=ApprovedUploader)
+def approved_uploader_changed(sender, instance, **kwargs):
+    bump_version("uploader", instance.student_id)
+
+
+# ---------------------- DASHBOARD COUNTERS ----------------------
+@receiver(post_save, sender=Department)
+def department_saved(sender, instance, created, **kwargs):
+    if created:
+        bump(DashboardCounter.DEPARTMENTS, 1)
+
+
+@receiver(post_delete, sender=Department)
+def department_deleted(sender, instance, **kwargs):
+    bump(DashboardCounter.DEPARTMENTS, -1)
+
+
+@receiver(post_save, sender=Subject)
+def subject_saved(sender, instance, created, **kwargs):
+    if created:
+        bump(DashboardCounter.SUBJECTS, 1)
+
+
+@receiver(post_delete, sender=Subject)
+def subject_deleted(sender, instance, **kwargs):
+    bump(DashboardCounter.SUBJECTS, -1)
+
+
+@receiver(post_init, sender=Resource)
+def resource_loaded(sender, instance, **kwargs):
+    # Remember the stored status and file so saves can detect transitions.
+    # Read from __dict__ so deferred fields are not fetched here.
+    instance._stored_status = instance.__dict__.get("status")
+    instance._stored_file = file_name(instance.__dict__.get("file"))
+    instance._stored_blob_id = instance.__dict__.get("blob_id")
+    instance._stored_subject_id = instance.__dict__.get("subject_id")
+
+
+def file_name(value):
+    return getattr(value, "name", value) or ""
+
+
+def is_pending(status):
+    return 1 if status == "pending" else 0
+
+
+@receiver(pre_save, sender=Resource)
+@receiver(pre_delete, sender=Resource)
+def resource_status_unknown(sender, instance, **kwargs):
+    # Loaded with status deferred (.only()/.defer()): read the stored value
+    # before it is overwritten or gone. A save that leaves status deferred
+    # does not write it, so needs nothing.
+    saving = kwargs["signal"] is pre_save
+    if (
+        instance._stored_status is None
+        and not instance._state.adding
+        and (not saving or "status" in instance.__dict__)
+    ):
+        instance._stored_status = (
+            Resource.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Resource)
+def resource_saved(sender, instance, created, **kwargs):
+    if created:
+        bump(DashboardCounter.RESOURCES, 1)
+        bump(DashboardCounter.PENDING_RESOURCES, is_pending(instance.status))
+    elif "status" in instance.__dict__:
+        bump(
+            DashboardCounter.PENDING_RESOURCES,
+            is_pending(instance.status) - is_pending(instance._stored_status),
+        )
+        instance._stored_status = instance.status
+
+
+@receiver(post_delete, sender=Resource)
+def resource_deleted(sender, instance, **kwargs):
+    bump(DashboardCounter.RESOURCES, -1)
+    bump(DashboardCounter.PENDING_RESOURCES, -is_pending(instance._stored_status))
+
+
+# ---------------------- SEARCH INDEX ----------------------
+@receiver(post_save, sender=Resource)
+def resource_search_saved(sender, instance, **kwargs):
+    index_resource(instance)
+
+
+@receiver(post_delete, sender=Resource)
+def resource_search_deleted(sender, instance, **kwargs):
+    unindex(SearchDocument.KIND_RESOURCE, instance.id)
+
+
+@receiver(post_save, sender=TutorialSuggestion)
+def tutorial_search_saved(sender, instance, **kwargs):
+    index_tutorial(instance)
+
+
+@receiver(post_delete, sender=TutorialSuggestion)
+def tutorial_search_deleted(sender, instance, **kwargs):
+    unindex(SearchDocument.KIND_TUTORIAL, instance.id)
+
+
+@receiver(post_save, sender=Subject)
+def subject_search_saved(sender, instance, created, **kwargs):
+    if not created:
+        reindex_subject(instance)
+
+
+# ---------------------- TEXT EXTRACTION ----------------------
+@receiver(post_save, sender=Resource)
+def resource_file_saved(sender, instance, created, **kwargs):
+    current = file_name(instance.file)
+    if current and (created or current != instance._stored_file):
+        schedule_extraction(instance)
+    instance._stored_file = current
+
+
+# ---------------------- DEDUPLICATED FILE STORAGE ----------------------
+@receiver(pre_save, sender=Resource)
+def resource_store_file(sender, instance, raw=False, **kwargs):
+    # A fresh upload is stored once under its content hash and the
+    # resource points at the shared copy instead of writing its own.
+    file = instance.file
+    if raw or not file or file._committed:
+        return
+
+    blob = store_file(file.file, file.name)
+    instance.blob = blob
+    instance.file = blob.file.name
+
+
+@receiver(post_save, sender=Resource)
+def resource_blob_saved(sender, instance, **kwargs):
+    if instance.blob_id != instance._stored_blob_id:
+        if instance.blob_id:
+            add_reference(instance.blob_id)
+        if instance._stored_blob_id:
+            drop_reference(instance._stored_blob_id)
+    instance._stored_blob_id = instance.blob_id
+
+
+@receiver(post_delete, sender=Resource)
+def resource_blob_deleted(sender, instance, **kwargs):
+    if instance.blob_id:
+        drop_reference(instance.blob_id)
+
+
+# ---------------------- PAGE CACHE ----------------------
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def department_page_changed(sender, instance, **kwargs):
+    # The home page lists every department
+    invalidate_page("home")
+
+
+# ---------------------- FRAGMENT VERSIONS ----------------------
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def resource_fragment_changed(sender, instance, **kwargs):
+    bump_version("subject", instance.subject_id, instance._stored_subject_id)
+    instance._stored_subject_id = instance.subject_id
+
+
+@receiver(post_save, sender=TutorialSuggestion)
+@receiver(post_delete, sender=TutorialSuggestion)
+def tutorial_fragment_changed(sender, instance, **kwargs):
+    bump_version("subject", instance.subject_id)
+
+
+@receiver(post_init, sender=Subject)
+def subject_loaded(sender, instance, **kwargs):
+    instance._stored_department_id = instance.__dict__.get("department_id")
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def subject_fragment_changed(sender, instance, **kwargs):
+    bump_version("subject", instance.id)
+    bump_version("department", instance.department_id, instance._stored_department_id)
+    instance._stored_department_id = instance.department_id
+
+
+# Bookmarks deliberately have no delete receivers: any would stop Django
+# from removing them with a single DELETE (batch API, cascades). Bookmark
+# and its queryset bump the stamp on delete themselves; cascades are
+# handled below.
+@receiver(post_save, sender=Bookmark)
+def bookmark_saved(sender, instance, **kwargs):
+    bump_version("bookmarks", instance.user_id)
+
+
+# Path from Bookmark to each model whose delete() cascades to resources
+BOOKMARKS_DELETED_WITH = {
+    Resource: "resource",
+    Subject: "resource__subject",
+    Department: "resource__subject__department",
+}
+
+
+@receiver(pre_delete, sender=Resource)
+def resource_bookmarks_deleting(sender, instance, origin=None, **kwargs):
+    # Sent for every resource in a cascade or queryset delete; the users
+    # are collected once for the whole delete() call (its origin) and
+    # each one is bumped once
+    if getattr(origin, "_bookmarks_bumped", False):
+        return
+
+    is_queryset = isinstance(origin, QuerySet)
+    path = BOOKMARKS_DELETED_WITH.get(origin.model if is_queryset else type(origin))
+    if path is None:
+        bookmarks = Bookmark.objects.filter(resource=instance)
+    else:
+        bookmarks = Bookmark.objects.filter(**{f"{path}__in" if is_queryset else path: origin})
+        origin._bookmarks_bumped = True
+
+    bump_version("bookmarks", *bookmarks.order_by().values_list("user_id", flat=True).distinct())
+
+
+@receiver(post_save, sender=Department)
+def department_fragment_changed(sender, instance, **kwargs):
+    bump_version("department", instance.id)
+
+
+# ---------------------- DEPARTMENT IMAGE VARIANTS ----------------------
+@receiver(post_init, sender=Department)
+def department_loaded(sender, instance, **kwargs):
+    instance._stored_image = file_name(instance.__dict__.get("image"))
+
+
+@receiver(pre_save, sender=Department)
+def department_image_changing(sender, instance, raw=False, **kwargs):
+    image = instance.image
+    instance._image_changed = not raw and (
+        file_name(image) != instance._stored_image or bool(image and not image._committed)
+    )
+    if instance._image_changed:
+        # Variants of the old image are dropped; new ones are made by the worker
+        instance._old_image_variants = instance.image_variants
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Department)
+def department_image_saved(sender, instance, **kwargs):
+    if getattr(instance, "_image_changed", False):
+        old = instance._old_image_variants
+        if old:
+            storage = instance.image.storage
+            transaction.on_commit(lambda: delete_variants(storage, old))
+        if instance.image:
+            enqueue("core.department_image_variants", {"department_id": instance.id})
+        instance._image_changed = False
+    instance._stored_image = file_name(instance.image)
+
+
+@receiver(post_delete, sender=Department)
+def department_image_deleted(sender, instance, **kwargs):
+    variants = instance.image_variants
+    if variants:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: delete_variants(storage, variants))
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .chunked import discard_session
+from .counters import rebuild_counters
+from .extraction import extract_resource_content
+from .images import delete_variants, generate_variants
+from .jobs import enqueue, task
+from .models import Department, ResourceContent, UploadSession
+from .pagecache import invalidate_page
+from .search import rebuild_search_index
+
+
+# ---------------------- TEXT EXTRACTION ----------------------
+@task("core.extract_resource_text")
+def extract_resource_text(resource_id):
+    content = (
+        ResourceContent.objects.filter(resource_id=resource_id, status="pending")
+        .select_related("resource")
+        .first()
+    )
+    if content is not None:
+        extract_resource_content(content)
+
+
+# ---------------------- CHUNKED UPLOADS ----------------------
+@task("core.expire_upload_session")
+def expire_upload_session(upload_id):
+    session = UploadSession.objects.filter(id=upload_id, status="active").first()
+    if session is None:
+        return
+
+    # Sessions still receiving chunks get pushed back instead of expiring
+    idle = (timezone.now() - session.updated_at).total_seconds()
+    if idle < settings.CHUNKED_UPLOAD_TTL:
+        enqueue(
+            "core.expire_upload_session",
+            {"upload_id": upload_id},
+            delay=settings.CHUNKED_UPLOAD_TTL - idle,
+        )
+        return
+
+    discard_session(session, "expired")
+
+
+# ---------------------- DEPARTMENT IMAGES ----------------------
+@task("core.department_image_variants")
+def department_image_variants(department_id):
+    department = Department.objects.filter(id=department_id).first()
+    if department is None or not department.image:
+        return
+
+    variants = generate_variants(department.image)
+
+    # Only record them if the image was not replaced while we worked
+    updated = Department.objects.filter(
+        id=department.id, image=department.image.name
+    ).update(image_variants=variants)
+    if updated:
+        # A re-run saves under fresh names, so drop the set it replaced
+        stale = {w: n for w, n in department.image_variants.items() if n not in variants.values()}
+        delete_variants(department.image.storage, stale)
+        invalidate_page("home")
+    else:
+        delete_variants(department.image.storage, variants)
+
+
+# ---------------------- MAINTENANCE ----------------------
+@task("core.rebuild_counters")
+def rebuild_counters_task():
+    rebuild_counters()
+
+
+@task("core.rebuild_search_index")
+def rebuild_search_index_task():
+    rebuild_search_index()
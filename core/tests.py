@@ -1,3 +1,1129 @@
-from django.test import TestCase
+import hashlib
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.db.models.functions import Lower
+from django.utils import timezone
+from PIL import Image
+
+from . import jobs, search as search_index, tasks
+from .counters import compute_counts, get_counters, rebuild_counters
+from .fragments import get_version, stamp, version_key
+from .models import (
+    Department,
+    Subject,
+    Resource,
+    ApprovedUploader,
+    TutorialSuggestion,
+    DashboardCounter,
+    ResourceContent,
+    Job,
+    StoredFile,
+    UploadSession,
+    VersionStamp,
+    Bookmark,
+)
+from .pagecache import anonymous_page_cache, page_cache_key, page_version_key
+from .pagination import keyset_page
+from .review import LEASE_TIMEOUT, claim_reviews
+from .usersearch import filter_users
+
+
+# ---------------------- SUBJECT DETAIL ----------------------
+class SubjectDetailQueryTests(TestCase):
+
+    # session, user, version stamps, subject, resources, tutorials,
+    # uploader check, bookmarks
+    QUERY_BUDGET = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user("student", password="pass")
+        department = Department.objects.create(name="CSE")
+        cls.subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        cls.uploaders = [
+            User.objects.create_user(f"uploader{i}", first_name=f"Up{i}")
+            for i in range(20)
+        ]
+
+    def add_resources(self, count):
+        types = [resource_type for resource_type, _ in Resource.RESOURCE_TYPES]
+        Resource.objects.bulk_create(
+            Resource(
+                subject=self.subject,
+                title=f"Resource {i}",
+                file="resources/dummy.pdf",
+                resource_type=types[i % len(types)],
+                uploaded_by=self.uploaders[i % len(self.uploaders)],
+                status="approved",
+            )
+            for i in range(count)
+        )
+        TutorialSuggestion.objects.bulk_create(
+            TutorialSuggestion(
+                subject=self.subject,
+                title=f"Tutorial {i}",
+                link="https://example.com",
+                added_by=self.uploaders[i % len(self.uploaders)],
+            )
+            for i in range(count // 10)
+        )
+
+    def count_queries(self):
+        url = reverse("subject_detail", args=[self.subject.id])
+        # Version stamps are minted on first use, like any other row; only
+        # the fragment cache starts cold
+        self.client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def test_query_count_is_constant_as_subject_grows(self):
+        self.add_resources(30)
+        small, _ = self.count_queries()
+
+        self.add_resources(3000)
+        large, response = self.count_queries()
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.QUERY_BUDGET)
+        self.assertEqual(len(response.context["notes"]), 1010)
+        self.assertEqual(len(response.context["pyqs"]), 1010)
+        self.assertEqual(len(response.context["faculty_notes"]), 1010)
+
+    def test_only_approved_resources_are_listed(self):
+        Resource.objects.create(
+            subject=self.subject, title="Pending", file="resources/p.pdf",
+            resource_type="note", status="pending", uploaded_by=self.uploaders[0],
+        )
+        Resource.objects.create(
+            subject=self.subject, title="Approved", file="resources/a.pdf",
+            resource_type="note", status="approved", uploaded_by=self.uploaders[0],
+        )
+        _, response = self.count_queries()
+
+        self.assertEqual([r.title for r in response.context["notes"]], ["Approved"])
+
+
+# ---------------------- UPLOADER PERMISSION ----------------------
+class UploaderPermissionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        cls.student = User.objects.create_user("student", password="pass")
+
+    def uploader_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("upload_resource"))
+        return response, sum("core_approveduploader" in q["sql"] for q in ctx.captured_queries)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_status_is_resolved_once_and_cached(self):
+        ApprovedUploader.objects.create(student=self.student, approved_by=self.faculty, is_active=True)
+        self.client.force_login(self.student)
+
+        # The view and the navbar context processor share one lookup
+        response, queries = self.uploader_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 1)
+
+        # Later requests are answered from the cache
+        self.assertEqual(self.uploader_queries()[1], 0)
+
+    def test_revoke_applies_to_the_next_request(self):
+        ApprovedUploader.objects.create(student=self.student, approved_by=self.faculty, is_active=True)
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse("upload_resource")).status_code, 200)
+
+        # The revocation bumps the student's stamp in the database, which
+        # keys the cached status in every worker
+        self.client.force_login(self.faculty)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("revoke_student_uploader", args=[self.student.id]))
+
+        self.client.force_login(self.student)
+        self.assertNotEqual(self.client.get(reverse("upload_resource")).status_code, 200)
+
+
+# ---------------------- DASHBOARD ----------------------
+class DashboardQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="pass")
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        department = Department.objects.create(name="CSE")
+        cls.subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+
+    def add_students(self, count):
+        for i in range(count):
+            student = User.objects.create_user(f"s{User.objects.count()}", first_name=f"S{i}")
+            ApprovedUploader.objects.create(student=student, approved_by=self.faculty)
+            Resource.objects.create(
+                subject=self.subject, title=f"Pending {i}", file="resources/p.pdf",
+                resource_type="note", uploaded_by=student,
+            )
+
+    def count_queries(self):
+        # Version stamps are minted on first use; only the cache starts cold
+        self.client.get(reverse("dashboard"))
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_query_count_is_independent_of_page_contents(self):
+        self.client.force_login(self.admin)
+
+        self.add_students(2)
+        small, _ = self.count_queries()
+
+        self.add_students(40)
+        large, response = self.count_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(large, 12)
+        self.assertEqual(len(response.context["reg_page_obj"]), 10)
+        statuses = {u.username: u.uploader_status for u in response.context["reg_page_obj"]}
+        self.assertIsNone(statuses.pop("faculty", None))
+        self.assertTrue(all(status.is_active for status in statuses.values()))
+
+
+# ---------------------- DASHBOARD COUNTERS ----------------------
+class DashboardCounterTests(TestCase):
+
+    def test_counters_follow_creates_transitions_and_deletes(self):
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        pending = Resource.objects.create(
+            subject=subject, title="Pending", file="resources/p.pdf", resource_type="note",
+        )
+        Resource.objects.create(
+            subject=subject, title="Approved", file="resources/a.pdf",
+            resource_type="note", status="approved",
+        )
+        self.assertEqual(get_counters(), compute_counts())
+
+        pending.status = "approved"
+        pending.save()
+        self.assertEqual(get_counters()[DashboardCounter.PENDING_RESOURCES], 0)
+
+        pending.status = "pending"
+        pending.save()
+        self.assertEqual(get_counters(), compute_counts())
+
+        department.delete()
+        self.assertEqual(get_counters(), compute_counts())
+        self.assertEqual(set(get_counters().values()), {0})
+
+    def test_deferred_status_does_not_drift(self):
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        for title in ("One", "Two", "Three"):
+            Resource.objects.create(subject=subject, title=title, file="resources/p.pdf", resource_type="note")
+
+        untouched = Resource.objects.only("id", "title").get(title="One")
+        untouched.title = "Renamed"
+        untouched.save()
+        approved = Resource.objects.defer("status").get(title="Two")
+        approved.status = "approved"
+        approved.save()
+        Resource.objects.defer("status").get(title="Three").delete()
+
+        self.assertEqual(get_counters(), compute_counts())
+        self.assertEqual(get_counters()[DashboardCounter.PENDING_RESOURCES], 1)
+
+    def test_rebuild_repairs_drift(self):
+        Department.objects.create(name="CSE")
+        DashboardCounter.objects.filter(name=DashboardCounter.DEPARTMENTS).update(value=42)
+
+        call_command("rebuild_counters", stdout=StringIO())
+
+        self.assertEqual(get_counters()[DashboardCounter.DEPARTMENTS], 1)
+
+
+# ---------------------- SEARCH ----------------------
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user("student", password="pass")
+        cse = Department.objects.create(name="CSE")
+        it = Department.objects.create(name="IT")
+        cls.dbms = Subject.objects.create(department=cse, name="DBMS", semester=4)
+        cls.networks = Subject.objects.create(department=it, name="Networks", semester=5)
+
+        cls.note = Resource.objects.create(
+            subject=cls.dbms, title="Normalization notes", file="resources/n.pdf",
+            resource_type="note", status="approved", description="1NF, 2NF and BCNF",
+        )
+        cls.pending = Resource.objects.create(
+            subject=cls.dbms, title="Normalization draft", file="resources/d.pdf",
+            resource_type="note",
+        )
+        cls.pyq = Resource.objects.create(
+            subject=cls.networks, title="Routing PYQ", file="resources/r.pdf",
+            resource_type="pyq", status="approved", description="normalization of routes",
+        )
+        TutorialSuggestion.objects.create(
+            subject=cls.dbms, title="Database normalization explained",
+            link="https://example.com",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def titles(self, **params):
+        response = self.client.get(reverse("search_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return [r["title"] for r in response.json()["results"]]
+
+    def test_ranked_results_cover_approved_resources_and_tutorials(self):
+        titles = self.titles(q="normalization")
+
+        self.assertEqual(set(titles), {
+            "Normalization notes", "Routing PYQ", "Database normalization explained",
+        })
+        self.assertEqual(titles[-1], "Routing PYQ")  # body-only match ranks last
+
+    def test_filters(self):
+        self.assertEqual(self.titles(q="normalization", type="pyq"), ["Routing PYQ"])
+        self.assertEqual(
+            set(self.titles(q="normalization", department=self.dbms.department_id, semester=4)),
+            {"Normalization notes", "Database normalization explained"},
+        )
+
+    def test_index_follows_moderation_and_deletes(self):
+        self.pending.status = "approved"
+        self.pending.save()
+        self.assertIn("Normalization draft", self.titles(q="draft"))
+
+        self.pending.delete()
+        self.assertEqual(self.titles(q="draft"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(len(self.titles(q='normalization" -*')), 3)
+
+
+# ---------------------- TEXT EXTRACTION ----------------------
+def make_pdf(*pages):
+    """Build a minimal PDF with one line of text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TextExtractionTests(TestCase):
+
+    def test_uploaded_pdf_is_extracted_and_searchable(self):
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        resource = Resource.objects.create(
+            subject=subject, title="Unit 3", resource_type="note", status="approved",
+            file=SimpleUploadedFile("unit3.pdf", make_pdf("Boyce Codd normal form", "Transactions")),
+        )
+        self.assertEqual(resource.content.status, "pending")
+
+        for job in jobs.claim("test", 10):
+            jobs.execute(job.id, job.locked_by)
+
+        content = ResourceContent.objects.get(resource=resource)
+        self.assertEqual(content.status, "done")
+        self.assertEqual(content.page_count, 2)
+        self.assertIn("Boyce Codd", content.text)
+        self.assertEqual([doc.object_id for doc in search_index.search("boyce")], [resource.id])
+
+    def test_backfill_command_only_queues_jobs(self):
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        resource = Resource.objects.create(
+            subject=subject, title="Unit 3", resource_type="note", status="approved",
+            file=SimpleUploadedFile("unit3.pdf", make_pdf("Boyce Codd normal form")),
+        )
+        Job.objects.all().delete()
+
+        call_command("extract_text", stdout=StringIO())
+        call_command("extract_text", stdout=StringIO())
+
+        self.assertEqual(
+            list(Job.objects.values_list("task", "payload")),
+            [("core.extract_resource_text", {"resource_id": resource.id})],
+        )
+        self.assertEqual(ResourceContent.objects.get(resource=resource).status, "pending")
+
+
+# ---------------------- JOB QUEUE ----------------------
+CALLS = []
+
+
+@jobs.task("tests.flaky")
+def flaky(fail_times):
+    CALLS.append(fail_times)
+    if len(CALLS) <= fail_times:
+        raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def run_due(self):
+        Job.objects.filter(status="queued").update(run_at=timezone.now())
+        return [jobs.execute(job.id, job.locked_by)["status"] for job in jobs.claim("test", 10)]
+
+    def test_success_deletes_job(self):
+        jobs.enqueue("tests.flaky", {"fail_times": 0})
+
+        self.assertEqual(self.run_due(), ["done"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retries_with_backoff_then_fails(self):
+        job = jobs.enqueue("tests.flaky", {"fail_times": 5}, max_attempts=2)
+
+        self.assertEqual(self.run_due(), ["retried"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(jobs.claim("test", 10), [])  # backing off
+
+        self.assertEqual(self.run_due(), ["failed"])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertIn("boom", job.last_error)
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        jobs.enqueue("tests.flaky", {"fail_times": 0})
+
+        self.assertEqual(len(jobs.claim("a", 10)), 1)
+        self.assertEqual(jobs.claim("b", 10), [])
+        self.assertEqual(jobs.queue_stats()["running"], 1)
+
+    def test_expired_lease_is_requeued_and_old_worker_cannot_finish_it(self):
+        job = jobs.enqueue("tests.flaky", {"fail_times": 0})
+        [first] = jobs.claim("a", 10)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - jobs.LEASE_TIMEOUT * 2)
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        [second] = jobs.claim("b", 10)
+
+        # The first worker's late outcome must not touch the new lease
+        self.assertEqual(jobs.execute(job.id, first.locked_by)["status"], "missing")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("running", second.locked_by))
+
+        jobs.heartbeat({second.locked_by})
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+    def test_expired_lease_fails_once_attempts_are_used_up(self):
+        job = jobs.enqueue("tests.flaky", {"fail_times": 0}, max_attempts=1)
+        jobs.claim("a", 10)
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - jobs.LEASE_TIMEOUT * 2)
+
+        jobs.requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+
+
+class RunJobsCommandTests(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("pool processes cannot reach an in-memory test database")
+
+    def test_process_pool_runs_claimed_job(self):
+        Department.objects.create(name="CSE")
+        DashboardCounter.objects.all().delete()
+        jobs.enqueue("core.rebuild_counters")
+
+        call_command("runjobs", pool="process", once=True, concurrency=2, interval=0.1, stdout=StringIO())
+
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(get_counters()[DashboardCounter.DEPARTMENTS], 1)
+
+
+# ---------------------- DEDUPLICATED STORAGE ----------------------
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DeduplicatedStorageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        department = Department.objects.create(name="CSE")
+        cls.dbms = Subject.objects.create(department=department, name="DBMS", semester=4)
+        cls.os = Subject.objects.create(department=department, name="OS", semester=4)
+
+    def create(self, title, data, subject=None):
+        return Resource.objects.create(
+            subject=subject or self.dbms, title=title, resource_type="pyq", status="approved",
+            file=SimpleUploadedFile(f"{title}.pdf", data),
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.create("2023 paper", b"same bytes")
+        second = self.create("Endsem 2023", b"same bytes")
+        other = self.create("2022 paper", b"other bytes")
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.blob_id, other.blob_id)
+        self.assertEqual(StoredFile.objects.get(id=first.blob_id).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        blob = StoredFile.objects.get(id=second.blob_id)
+        self.assertEqual(blob.ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredFile.objects.filter(id=blob.id).exists())
+        self.assertFalse(blob.file.storage.exists(blob.file.name))
+
+    def test_upload_form_reports_existing_copy(self):
+        self.create("2023 paper", b"same bytes", subject=self.os)
+        self.client.force_login(self.faculty)
+        data = {"subject": self.dbms.id, "title": "Copy", "resource_type": "pyq"}
+
+        response = self.client.post(
+            reverse("upload_resource"), {**data, "file": SimpleUploadedFile("copy.pdf", b"same bytes")}
+        )
+        self.assertContains(response, "already exists in OS")
+        self.assertEqual(Resource.objects.count(), 1)
+
+        self.client.post(
+            reverse("upload_resource"),
+            {**data, "allow_duplicate": "1", "file": SimpleUploadedFile("copy.pdf", b"same bytes")},
+        )
+        self.assertEqual(Resource.objects.count(), 2)
+        self.assertEqual(StoredFile.objects.get().ref_count, 2)
+
+    def test_duplicate_check_hides_other_users_unapproved_uploads(self):
+        student = User.objects.create_user("student", password="pass")
+        pending = self.create("Leaked paper", b"secret bytes")
+        Resource.objects.filter(id=pending.id).update(status="pending")
+        sha = hashlib.sha256(b"secret bytes").hexdigest()
+        url = reverse("resource_duplicate_api") + f"?sha256={sha}"
+
+        self.client.force_login(student)
+        self.assertEqual(self.client.get(url).json(), {"exists": False})
+
+        Resource.objects.filter(id=pending.id).update(uploaded_by=student)
+        self.assertEqual(self.client.get(url).json()["title"], "Leaked paper")
+
+        Resource.objects.filter(id=pending.id).update(uploaded_by=None, status="approved")
+        self.assertTrue(self.client.get(url).json()["exists"])
+
+
+# ---------------------- CHUNKED UPLOADS ----------------------
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(), CHUNKED_UPLOAD_DIR=tempfile.mkdtemp(), CHUNKED_UPLOAD_CHUNK_SIZE=4
+)
+class ChunkedUploadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        department = Department.objects.create(name="CSE")
+        cls.subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+
+    def send(self, upload_id, offset, data, checksum=None):
+        return self.client.post(
+            reverse("upload_session_chunk", args=[upload_id]) + f"?offset={offset}",
+            data, content_type="application/octet-stream",
+            headers={"X-Chunk-SHA256": checksum or hashlib.sha256(data).hexdigest()},
+        )
+
+    def test_resumable_upload_creates_resource(self):
+        self.client.force_login(self.faculty)
+        data = b"0123456789"
+
+        response = self.client.post(reverse("upload_session_create"), {
+            "filename": "notes.pdf", "size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+        })
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.json()["upload_id"]
+
+        self.assertEqual(self.send(upload_id, 0, data[:4]).json()["offset"], 4)
+
+        # A corrupted chunk is rejected and the offset stays put
+        response = self.send(upload_id, 4, data[4:8], checksum="0" * 64)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["offset"], 4)
+
+        # Resuming: the client asks where to continue from
+        self.assertEqual(
+            self.client.get(reverse("upload_session_status", args=[upload_id])).json()["offset"], 4
+        )
+        self.assertEqual(self.send(upload_id, 0, data[:4]).status_code, 409)
+        self.send(upload_id, 4, data[4:8])
+        self.send(upload_id, 8, data[8:])
+
+        response = self.client.post(reverse("upload_session_complete", args=[upload_id]), {
+            "subject": self.subject.id, "title": "Notes", "resource_type": "note",
+        })
+        self.assertEqual(response.status_code, 201)
+
+        resource = Resource.objects.get(id=response.json()["resource_id"])
+        self.assertEqual(resource.blob.sha256, hashlib.sha256(data).hexdigest())
+        with resource.file.open("rb") as stored:
+            self.assertEqual(stored.read(), data)
+
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual((session.status, session.resource_id), ("complete", resource.id))
+        self.assertFalse(os.path.exists(session.path))
+
+
+# ---------------------- DOWNLOADS ----------------------
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ResourceDownloadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user("student", password="pass")
+        cls.other = User.objects.create_user("other", password="pass")
+        department = Department.objects.create(name="CSE")
+        cls.subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+
+    def setUp(self):
+        self.resource = Resource.objects.create(
+            subject=self.subject, title="Unit 1 notes", resource_type="note", status="approved",
+            uploaded_by=self.student, file=SimpleUploadedFile("unit1.pdf", b"0123456789"),
+        )
+        self.client.force_login(self.other)
+
+    def test_full_download_is_cacheable(self):
+        response = self.client.get(self.resource.download_url)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["ETag"], f'"{self.resource.blob.sha256}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.client.get(self.resource.download_url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_byte_ranges(self):
+        url = self.resource.download_url
+        response = self.client.get(url, headers={"Range": "bytes=2-5"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+
+        response = self.client.get(url, headers={"Range": "bytes=-3"})
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+        response = self.client.get(url, headers={"Range": "bytes=20-"})
+        self.assertEqual(response.status_code, 416)
+
+        # Partial copy is stale: send the whole file
+        response = self.client.get(url, headers={"Range": "bytes=2-5", "If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_resource_is_hidden_from_other_students(self):
+        Resource.objects.filter(id=self.resource.id).update(status="pending")
+        self.assertEqual(self.client.get(self.resource.download_url).status_code, 404)
+
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(self.resource.download_url).status_code, 200)
+
+    @override_settings(SENDFILE_BACKEND="nginx")
+    def test_sendfile_offload(self):
+        response = self.client.get(self.resource.download_url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.resource.file.name)
+        self.assertEqual(response.content, b"")
+
+
+# ---------------------- DEPARTMENT IMAGES ----------------------
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "navy").save(buffer, "JPEG")
+    return SimpleUploadedFile("cse.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DepartmentImageTests(TestCase):
+
+    def test_variants_are_built_and_replaced(self):
+        department = Department.objects.create(name="CSE", image=make_image(2000, 1000))
+        self.assertTrue(Job.objects.filter(task="core.department_image_variants").exists())
+
+        tasks.department_image_variants(department.id)
+        department.refresh_from_db()
+
+        self.assertEqual(sorted(department.image_variants, key=int), ["160", "480", "960", "1440"])
+        storage = department.image.storage
+        with storage.open(department.image_variants["480"]) as variant:
+            image = Image.open(variant)
+            self.assertEqual((image.format, image.size), ("WEBP", (480, 240)))
+        self.assertIn("-160w.webp 160w", department.image_srcset)
+        self.assertTrue(department.image_card_url.endswith("-480w.webp"))
+
+        # Running again replaces the variants it recorded, not anyone else's
+        first = department.image_variants
+        tasks.department_image_variants(department.id)
+        department.refresh_from_db()
+        self.assertNotEqual(department.image_variants, first)
+        self.assertFalse(any(storage.exists(name) for name in first.values()))
+
+        old = department.image_variants
+        department.image = make_image(300, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            department.save()
+        self.assertEqual(department.image_variants, {})
+        self.assertFalse(any(storage.exists(name) for name in old.values()))
+
+        # Small originals are never upscaled
+        tasks.department_image_variants(department.id)
+        department.refresh_from_db()
+        self.assertEqual(list(department.image_variants), ["160", "300"])
+
+    def test_originals_with_the_same_stem_keep_separate_variants(self):
+        png = BytesIO()
+        Image.new("RGB", (200, 100), "red").save(png, "PNG")
+        math = Department.objects.create(name="Maths", image=SimpleUploadedFile("math.png", png.getvalue()))
+        jpeg = make_image(200, 100)
+        jpeg.name = "math.jpg"
+        other = Department.objects.create(name="Applied Maths", image=jpeg)
+
+        tasks.department_image_variants(math.id)
+        tasks.department_image_variants(other.id)
+        math.refresh_from_db()
+        other.refresh_from_db()
+
+        self.assertTrue(math.image_variants["160"].endswith("math.png-160w.webp"))
+        self.assertNotEqual(math.image_variants["160"], other.image_variants["160"])
+        storage = math.image.storage
+        with storage.open(math.image_variants["160"]) as variant:
+            self.assertGreater(Image.open(variant).convert("RGB").getpixel((0, 0))[0], 200)
+
+
+# ---------------------- ANONYMOUS PAGE CACHE ----------------------
+class AnonymousPageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Department.objects.create(name="CSE")
+
+    def test_home_is_served_from_cache_until_departments_change(self):
+        self.client.get(reverse("home"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "CSE")
+        self.assertIn("Cookie", response["Vary"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(name="Mechanical")
+        self.assertContains(self.client.get(reverse("home")), "Mechanical")
+
+    def test_invalidation_elsewhere_is_seen_once_the_version_expires(self):
+        self.client.get(reverse("home"))
+        cached = page_cache_key("home", get_version("page", "home"))
+        Department.objects.filter(name="CSE").update(name="Computer Science")
+
+        # As from runjobs or another worker: only the stamp row changes,
+        # and the copies in this process's cache are left where they are
+        stamp([version_key("page", "home")])
+        self.assertContains(self.client.get(reverse("home")), "CSE")
+
+        cache.delete(page_version_key("home"))  # PAGE_VERSION_TIMEOUT passes
+        self.assertIsNotNone(cache.get(cached))
+        self.assertContains(self.client.get(reverse("home")), "Computer Science")
+
+    def test_pages_that_use_a_csrf_token_are_not_cached(self):
+        view = anonymous_page_cache("csrf-test")(lambda request: HttpResponse(get_token(request)))
+        first = view(RequestFactory().get("/")).content
+        self.assertNotEqual(view(RequestFactory().get("/")).content, first)
+
+    def test_logged_in_users_bypass_cache(self):
+        self.client.get(reverse("home"))
+        user = User.objects.create_user("student", password="pass")
+        self.client.force_login(user)
+        self.assertContains(self.client.get(reverse("home")), "student")
+
+
+# ---------------------- FRAGMENT CACHE ----------------------
+class SubjectFragmentCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user("student", password="pass")
+        department = Department.objects.create(name="CSE")
+        cls.subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        cls.resource = Resource.objects.create(
+            subject=cls.subject, title="Unit 1 notes", resource_type="note",
+            status="approved", uploaded_by=cls.student, file="resources/unit1.pdf",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+        self.url = reverse("subject_detail", args=[self.subject.id])
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        tables = ('"core_resource"', '"core_tutorialsuggestion"')
+        return response, [q["sql"] for q in ctx.captured_queries if any(t in q["sql"] for t in tables)]
+
+    def test_lists_render_from_cache_until_subject_changes(self):
+        _, queries = self.list_queries()
+        self.assertTrue(queries)
+
+        response, queries = self.list_queries()
+        self.assertEqual(queries, [])
+        self.assertContains(response, "Unit 1 notes")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Resource.objects.create(
+                subject=self.subject, title="Unit 2 notes", resource_type="note",
+                status="approved", uploaded_by=self.student, file="resources/unit2.pdf",
+            )
+        response, queries = self.list_queries()
+        self.assertTrue(queries)
+        self.assertContains(response, "Unit 2 notes")
+
+    def test_viewer_state_is_layered_on_cached_lists(self):
+        Bookmark.objects.create(user=self.student, resource=self.resource)
+        self.client.get(self.url)
+
+        other = User.objects.create_user("other", password="pass")
+        self.client.force_login(other)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.context["viewer"]["bookmarked_ids"], [])
+        self.assertContains(response, f'data-owner-id="{self.student.id}"')
+
+    def test_unchanged_page_answers_304(self):
+        # The first render mints the page's stamp; ETags follow from then on
+        self.assertFalse(self.client.get(self.url).has_header("ETag"))
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("private", response["Cache-Control"])
+
+        with self.assertNumQueries(3):  # session, user and version stamps
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Validated by ETag only, which changes with the viewer's standing
+        self.assertNotIn("Last-Modified", response)
+        with self.captureOnCommitCallbacks(execute=True):
+            ApprovedUploader.objects.create(student=self.student, is_active=True)
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # The viewer's own bookmarks are part of the page
+        with self.captureOnCommitCallbacks(execute=True):
+            Bookmark.objects.create(user=self.student, resource=self.resource)
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_unknown_ids_add_no_stamps(self):
+        self.client.get(self.url)
+        stamps = VersionStamp.objects.count()
+        for name in ("subject_detail", "department_detail"):
+            response = self.client.get(reverse(name, args=[987654]))
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(VersionStamp.objects.count(), stamps)
+
+
+# ---------------------- BOOKMARK API ----------------------
+class BookmarkBatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user("student", password="pass")
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        cls.resources = Resource.objects.bulk_create(
+            Resource(subject=subject, title=f"Notes {i}", resource_type="note",
+                     status="approved", file=f"resources/{i}.pdf")
+            for i in range(4)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def batch(self, **body):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("bookmark_batch_api"), json.dumps(body), content_type="application/json"
+            )
+
+    def test_batch_updates_and_status_revalidates(self):
+        ids = [r.id for r in self.resources]
+        self.batch(add=ids[:3])
+        self.batch(add=ids[:2], remove=[ids[2]])
+
+        response = self.client.get(reverse("bookmark_status_api"))
+        self.assertEqual(sorted(response.json()["bookmarked_ids"]), ids[:2])
+        etag = response["ETag"]
+
+        with self.assertNumQueries(3):  # session, user and version stamp
+            response = self.client.get(reverse("bookmark_status_api"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.batch(remove=ids)
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 1)
+
+        response = self.client.get(reverse("bookmark_status_api"), headers={"If-None-Match": etag})
+        self.assertEqual(response.json()["bookmarked_ids"], [])
+
+
+    def test_subject_delete_bumps_each_user_once(self):
+        subject = self.resources[0].subject
+        users = [User.objects.create_user(f"reader{i}") for i in range(3)]
+        Bookmark.objects.bulk_create(
+            Bookmark(user=user, resource=resource) for user in users for resource in self.resources
+        )
+        before = {user.id: get_version("bookmarks", user.id) for user in users}
+
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            subject.delete()
+        lookups = [q for q in ctx.captured_queries if q["sql"].startswith('SELECT DISTINCT "core_bookmark"')]
+        self.assertEqual(len(lookups), 1)
+        self.assertTrue(all(get_version("bookmarks", user.id) != before[user.id] for user in users))
+
+
+    def test_admin_deletes_bump_owners_stamps(self):
+        admin = User.objects.create_superuser("admin", password="pass")
+        bookmarks = Bookmark.objects.bulk_create(Bookmark(user=self.student, resource=r) for r in self.resources)
+        self.client.force_login(admin)
+        changelist = reverse("admin:core_bookmark_changelist")
+
+        before = get_version("bookmarks", self.student.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("admin:core_bookmark_delete", args=[bookmarks[0].id]), {"post": "yes"})
+        after_one = get_version("bookmarks", self.student.id)
+        self.assertNotEqual(after_one, before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(changelist, {
+                "action": "delete_selected", "post": "yes",
+                "_selected_action": [b.id for b in bookmarks[1:]],
+            })
+        self.assertFalse(Bookmark.objects.exists())
+        self.assertNotEqual(get_version("bookmarks", self.student.id), after_one)
+
+
+# ---------------------- BULK MODERATION ----------------------
+class BulkModerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        department = Department.objects.create(name="CSE")
+        cls.dbms = Subject.objects.create(department=department, name="DBMS", semester=4)
+        cls.os = Subject.objects.create(department=department, name="OS", semester=4)
+        for subject in (cls.dbms, cls.os):
+            for i in range(3):
+                Resource.objects.create(
+                    subject=subject, title=f"{subject.name} transactions {i}", resource_type="note",
+                    file=f"resources/{subject.name}{i}.pdf",
+                )
+        rebuild_counters()
+
+    def setUp(self):
+        self.client.force_login(self.faculty)
+
+    def moderate(self, **data):
+        return self.client.post(
+            reverse("bulk_moderate_uploads"), data, headers={"X-Requested-With": "XMLHttpRequest"}
+        )
+
+    def test_approve_subject_in_one_update(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.moderate(action="approve", scope="subject", subject=self.dbms.id)
+        self.assertEqual(response.json()["updated"], 3)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "core_resource"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual(Resource.objects.filter(subject=self.dbms, status="approved").count(), 3)
+        self.assertEqual(get_counters()[DashboardCounter.PENDING_RESOURCES], 3)
+        self.assertEqual(len(search_index.search("transactions")), 3)
+
+        # Already moderated rows are left alone
+        self.assertEqual(self.moderate(action="reject", scope="subject", subject=self.dbms.id).json()["updated"], 0)
+
+    def test_malformed_subject_is_an_empty_selection(self):
+        response = self.moderate(action="approve", scope="subject", subject="abc")
+        self.assertEqual(response.json(), self.moderate(action="approve", scope="subject").json())
+        self.assertEqual(response.json()["updated"], 0)
+        self.assertFalse(Resource.objects.filter(status="approved").exists())
+
+    def test_reject_selected(self):
+        self.assertContains(self.client.get(reverse("review_uploads")), "OS (Sem 4) – 3 pending")
+        ids = list(Resource.objects.filter(subject=self.os).values_list("id", flat=True)[:2])
+        self.assertEqual(self.moderate(action="reject", ids=ids).json()["updated"], 2)
+        self.assertEqual(Resource.objects.filter(status="rejected").count(), 2)
+        self.assertEqual(get_counters()[DashboardCounter.PENDING_RESOURCES], 4)
+
+
+# ---------------------- REVIEW LEASES ----------------------
+class ReviewLeaseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user("alice", password="pass", is_staff=True)
+        cls.bob = User.objects.create_user("bob", password="pass", is_staff=True)
+        department = Department.objects.create(name="CSE")
+        subject = Subject.objects.create(department=department, name="DBMS", semester=4)
+        for i in range(25):
+            Resource.objects.create(
+                subject=subject, title=f"Upload {i}", resource_type="note", file=f"resources/{i}.pdf",
+            )
+
+    def test_reviewers_get_disjoint_slices(self):
+        alice = set(claim_reviews(self.alice, limit=10).values_list("id", flat=True))
+        bob = set(claim_reviews(self.bob, limit=10).values_list("id", flat=True))
+        self.assertEqual((len(alice), len(bob)), (10, 10))
+        self.assertFalse(alice & bob)
+
+        # Claiming again renews the same slice instead of taking more
+        self.assertEqual(set(claim_reviews(self.alice, limit=10).values_list("id", flat=True)), alice)
+
+        # An expired lease goes back to the pool
+        Resource.objects.filter(id__in=alice).update(claimed_at=timezone.now() - LEASE_TIMEOUT * 2)
+        bob_again = set(claim_reviews(self.bob, limit=20).values_list("id", flat=True))
+        self.assertEqual(len(bob_again), 20)
+        self.assertTrue(alice & bob_again)
+
+    def test_review_page_shows_slice_and_pages_the_rest(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("review_uploads"))
+        self.assertEqual(len(response.context["claimed"]), 10)
+        self.assertEqual(len(response.context["others"]), 15)
+        self.assertFalse(response.context["others"].has_next)
+
+    def test_subject_filter_applies_to_slice_and_queue(self):
+        subject = Subject.objects.create(department=Department.objects.get(), name="OS", semester=4)
+        os_uploads = {
+            Resource.objects.create(
+                subject=subject, title=f"OS upload {i}", resource_type="note", file=f"resources/os{i}.pdf",
+            ).id
+            for i in range(12)
+        }
+
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("review_uploads"), {"subject": subject.id})
+        claimed = {r.id for r in response.context["claimed"]}
+        others = {r.id for r in response.context["others"]}
+        self.assertEqual((len(claimed), len(others)), (10, 2))
+        self.assertEqual(claimed | others, os_uploads)
+        self.assertEqual(response.context["selected_subject"], str(subject.id))
+
+
+# ---------------------- KEYSET PAGINATION ----------------------
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        names = ["asha", "Bilal", "chen", "Asha", "dev", "Esha", "farah", "bilal"]
+        for i in range(23):
+            User.objects.create_user(f"student{i}", first_name=names[i % len(names)], last_name=f"S{i % 3}")
+
+    def test_pages_forward_and_back(self):
+        users = User.objects.annotate(first_key=Lower("first_name"), last_key=Lower("last_name"))
+        ordering = ("first_key", "last_key", "id")
+        expected = list(users.order_by(*ordering).values_list("id", flat=True))
+
+        pages, cursor = [], None
+        while True:
+            page = keyset_page(users, ordering, cursor, per_page=5)
+            pages.append([u.id for u in page])
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sum(pages, []), expected)
+
+        # Walk back from the last page
+        back = keyset_page(users, ordering, page.previous_cursor, per_page=5)
+        self.assertEqual([u.id for u in back], pages[-2])
+
+    def test_dashboard_pages_without_count(self):
+        self.client.force_login(self.faculty)
+        response = self.client.get(reverse("dashboard"), {"sort": "newest"})
+        page = response.context["reg_page_obj"]
+        self.assertEqual(len(page), 10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("dashboard"), {"sort": "newest", "cursor": page.next_cursor})
+        self.assertFalse(any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+        ids = [u.id for u in page] + [u.id for u in response.context["reg_page_obj"]]
+        self.assertEqual(len(set(ids)), 20)
+
+
+# ---------------------- USER SEARCH ----------------------
+class UserSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = User.objects.create_user("faculty", password="pass", is_staff=True)
+        cls.ada = User.objects.create_user("ada", first_name="Ada", last_name="Lovelace", email="ada@example.com")
+        User.objects.create_user("ghopper", first_name="Grace", last_name="Hopper", email="grace@example.com")
+
+    def test_matches_across_fields_and_follows_renames(self):
+        users = User.objects.all()
+        self.assertEqual(list(filter_users(users, "ada LOVE")), [self.ada])
+        self.assertEqual(list(filter_users(users, "xampl")), list(users.exclude(email="").order_by("id")))
+
+        self.ada.last_name = "Byron"
+        self.ada.save()
+        self.assertFalse(filter_users(users, "lovelace").exists())
+        self.assertEqual(list(filter_users(users, "byron")), [self.ada])
+
+    def test_typeahead_endpoint(self):
+        self.client.force_login(self.faculty)
+        response = self.client.get(reverse("user_search_api"), {"q": "hop", "limit": 5})
+        self.assertEqual([u["username"] for u in response.json()["results"]], ["ghopper"])
+
+        response = self.client.get(reverse("user_search_api"), {"q": "a"})
+        self.assertEqual(response.json()["results"], [])
+
+        self.client.force_login(self.ada)
+        self.assertEqual(self.client.get(reverse("user_search_api"), {"q": "hop"}).status_code, 403)
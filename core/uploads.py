@@ -0,0 +1,48 @@
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+# ---------------------- HASHING UPLOAD HANDLERS ----------------------
+# Drop-in replacements for Django's default handlers that compute the
+# SHA-256 of each file while its chunks arrive, so deduplication never
+# has to read the upload a second time. The digest is attached to the
+# resulting UploadedFile as `sha256`.
+
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Only hash when this handler keeps the file; otherwise the chunk
+        # is passed on and hashed by the temporary-file handler.
+        if self.activated:
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
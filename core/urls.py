@@ -18,6 +18,11 @@ urlpatterns = [
 
     path("about/", views.about, name="about"),
 
+    path("review/bulk/", views.bulk_moderate_uploads, name="bulk_moderate_uploads"),
+    path("review/release/", views.release_review_claims, name="release_review_claims"),
+
+    path("resources/<int:id>/download/", views.download_resource, name="download_resource"),
+
     path("add_bookmark/<int:resource_id>/", views.add_bookmark, name="add_bookmark"),
     path("remove_bookmark/<int:resource_id>/", views.remove_bookmark, name="remove_bookmark"),
 
@@ -26,6 +31,19 @@ urlpatterns = [
     path("bookmark/toggle/", views.toggle_bookmark_ajax, name="toggle_bookmark_ajax"),
 
     path("api/bookmarks/status/", views.bookmark_status_api, name="bookmark_status_api"),
+    path("api/bookmarks/batch/", views.bookmark_batch_api, name="bookmark_batch_api"),
+
+    path("api/resources/duplicate/", views.resource_duplicate_api, name="resource_duplicate_api"),
+
+    path("api/uploads/", views.upload_session_create, name="upload_session_create"),
+    path("api/uploads/<uuid:upload_id>/", views.upload_session_status, name="upload_session_status"),
+    path("api/uploads/<uuid:upload_id>/chunk/", views.upload_session_chunk, name="upload_session_chunk"),
+    path("api/uploads/<uuid:upload_id>/complete/", views.upload_session_complete, name="upload_session_complete"),
+
+    path("search/", views.search, name="search"),
+    path("api/search/", views.search_api, name="search_api"),
+
+    path("api/users/search/", views.user_search_api, name="user_search_api"),
 
 
 ]
@@ -0,0 +1,61 @@
+from django.db import connection
+from django.db.models import BooleanField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat, Lower
+
+
+USER_FTS_TABLE = "core_user_fts"
+
+TYPEAHEAD_LIMIT = 8
+TYPEAHEAD_MAX_LIMIT = 25
+TYPEAHEAD_MIN_LENGTH = 2
+
+# The FTS5 trigram tokenizer needs at least one full trigram to use its index
+MIN_TRIGRAM_LENGTH = 3
+
+# Must match the expression in the trigram index (migration 0023) exactly,
+# or PostgreSQL will not use it
+SEARCH_TEXT = (
+    "LOWER(auth_user.username || ' ' || auth_user.first_name || ' ' "
+    "|| auth_user.last_name || ' ' || auth_user.email)"
+)
+
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filter_users(users, query):
+    """
+    Users whose username, name or email contains `query`, case-insensitively.
+
+    The four fields are searched as one string, so "ada love" finds Ada
+    Lovelace. Backed by a pg_trgm GIN index on PostgreSQL and a trigram
+    FTS5 table on SQLite; other backends (and SQLite queries too short for
+    a trigram) fall back to an unindexed contains.
+    """
+    query = " ".join(query.split()).lower()
+    if not query:
+        return users
+
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        return users.filter(RawSQL(
+            f"{SEARCH_TEXT} LIKE %s", (f"%{escape_like(query)}%",), output_field=BooleanField()
+        ))
+
+    if vendor == "sqlite" and len(query) >= MIN_TRIGRAM_LENGTH:
+        # A quoted phrase is a plain substring match for the trigram tokenizer
+        phrase = '"' + query.replace('"', '""') + '"'
+        return users.filter(RawSQL(
+            f"auth_user.id IN (SELECT rowid FROM {USER_FTS_TABLE} WHERE {USER_FTS_TABLE} MATCH %s)",
+            (phrase,),
+            output_field=BooleanField(),
+        ))
+
+    return users.annotate(
+        search_text=Lower(Concat(
+            "username", Value(" "), "first_name", Value(" "), "last_name", Value(" "), "email"
+        ))
+    ).filter(search_text__contains=query)
@@ -1,16 +1,21 @@
 # ---------------------- IMPORTS ----------------------
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
 from django.contrib import messages
 from django.contrib.auth import login
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST, require_safe
 from django.contrib.auth.models import User
 
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
+import json
 from itertools import groupby
 
 from .models import (
@@ -19,9 +24,25 @@ from .models import (
     Resource,
     ApprovedUploader,
     TutorialSuggestion,
-    Bookmark
+    Bookmark,
+    DashboardCounter,
+    UploadSession,
 )
 
+from . import search as search_index
+from .blobs import file_sha256, find_duplicate
+from .chunked import ChunkError, assemble, discard_session, start_session, write_chunk
+from .conditional import department_etag, subject_etag
+from .counters import get_counters
+from .downloads import serve_resource
+from .fragments import FRAGMENT_TIMEOUT, bump_version, get_version
+from .moderation import moderate
+from .pagination import estimated_count, keyset_page
+from .pagecache import anonymous_page_cache
+from .permissions import is_approved_uploader
+from .review import LEASE_TIMEOUT, claim_reviews, release_reviews
+from .usersearch import TYPEAHEAD_LIMIT, TYPEAHEAD_MAX_LIMIT, TYPEAHEAD_MIN_LENGTH, filter_users
+
 from .forms import (
     ResourceForm,
     FacultyCreationForm,
@@ -50,6 +71,7 @@ def register(request):
 
 
 # ---------------------- HOME ----------------------
+@anonymous_page_cache("home")
 def home(request):
     departments = Department.objects.all()
     return render(request, 'home.html', {'departments': departments})
@@ -57,19 +79,25 @@ def home(request):
 
 # ---------------------- DEPARTMENT DETAIL ----------------------
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=department_etag)
 def department_detail(request, id):
     department = get_object_or_404(Department, id=id)
 
-    # Get subjects grouped by semester
-    subjects = Subject.objects.filter(department=department).order_by("semester", "name")
-
-    semesters = {}
-    for subject in subjects:
-        semesters.setdefault(subject.semester, []).append(subject)
+    # Get subjects grouped by semester. Lazy: only evaluated when the
+    # cached fragment for this department version is missing.
+    def group_by_semester():
+        subjects = Subject.objects.filter(department=department).order_by("semester", "name")
+        semesters = {}
+        for subject in subjects:
+            semesters.setdefault(subject.semester, []).append(subject)
+        return semesters
 
     context = {
         "department": department,
-        "semesters": semesters,  # 🔥 grouped data
+        "semesters": SimpleLazyObject(group_by_semester),  # 🔥 grouped data
+        "fragment_version": get_version("department", department.id, request, create=True),
+        "fragment_timeout": FRAGMENT_TIMEOUT,
     }
 
     return render(request, "department_detail.html", context)
@@ -78,16 +106,29 @@ def department_detail(request, id):
 
 # ---------------------- SUBJECT DETAIL ----------------------
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=subject_etag)
 def subject_detail(request, id):
     subject = get_object_or_404(Subject, id=id)
 
-    tutorials = TutorialSuggestion.objects.filter(subject=subject)
+    tutorials = TutorialSuggestion.objects.filter(subject=subject).select_related("added_by")
+
+    # One query for every approved resource, bucketed by type in Python.
+    # Lazy: the lists are only built when the cached fragment for this
+    # subject version is missing.
+    def bucket_resources():
+        resources = (
+            Resource.objects.filter(subject=subject, status='approved')
+            .select_related("uploaded_by")
+        )
+        buckets = {resource_type: [] for resource_type, _ in Resource.RESOURCE_TYPES}
+        for resource in resources:
+            buckets.setdefault(resource.resource_type, []).append(resource)
+        return buckets
 
-    notes = Resource.objects.filter(subject=subject, resource_type='note', status='approved')
-    pyqs = Resource.objects.filter(subject=subject, resource_type='pyq', status='approved')
-    faculty_notes = Resource.objects.filter(subject=subject, resource_type='faculty', status='approved')
+    buckets = SimpleLazyObject(bucket_resources)
 
-    approved_uploader = ApprovedUploader.objects.filter(student=request.user, is_active=True).exists()
+    approved_uploader = is_approved_uploader(request)
 
     bookmarked_ids = set(
         Bookmark.objects.filter(user=request.user)
@@ -96,12 +137,21 @@ def subject_detail(request, id):
 
     context = {
         'subject': subject,
-        'notes': notes,
-        'pyqs': pyqs,
-        'faculty_notes': faculty_notes,
+        'notes': SimpleLazyObject(lambda: buckets['note']),
+        'pyqs': SimpleLazyObject(lambda: buckets['pyq']),
+        'faculty_notes': SimpleLazyObject(lambda: buckets['faculty']),
         'tutorials': tutorials,
         'approved_uploader': approved_uploader,
         'bookmarked_ids': bookmarked_ids,
+        # The cached lists are the same for everyone; bookmark state and
+        # delete buttons are applied on top from this
+        'viewer': {
+            'user_id': request.user.id,
+            'is_staff': request.user.is_staff,
+            'bookmarked_ids': sorted(bookmarked_ids),
+        },
+        'fragment_version': get_version("subject", subject.id, request, create=True),
+        'fragment_timeout': FRAGMENT_TIMEOUT,
     }
     return render(request, 'subject_detail.html', context)
 
@@ -113,7 +163,7 @@ def add_tutorial(request, subject_id):
 
     if not (
         request.user.is_staff or
-        ApprovedUploader.objects.filter(student=request.user, is_active=True).exists()
+        is_approved_uploader(request)
     ):
         return HttpResponseForbidden("You are not allowed to add tutorials.")
 
@@ -143,23 +193,35 @@ def upload_resource(request):
     if request.user.is_staff:
         uploader_role = "faculty"
     else:
-        if not ApprovedUploader.objects.filter(student=request.user, is_active=True).exists():
+        if not is_approved_uploader(request):
             return HttpResponseForbidden("You are not approved to upload.")
         uploader_role = "student"
 
+    duplicate = None
+
     if request.method == "POST":
         form = ResourceForm(request.POST, request.FILES)
         if form.is_valid():
-            resource = form.save(commit=False)
-            resource.uploaded_by = request.user
-            resource.status = "approved" if uploader_role == "faculty" else "pending"
-            resource.save()
-            messages.success(request, "Resource uploaded successfully!")
-            return redirect("my_uploads")
+            # Hash was computed while the upload streamed in; nothing has
+            # been written to storage yet
+            duplicate = find_duplicate(file_sha256(form.cleaned_data["file"]), request.user)
+            if duplicate and not request.POST.get("allow_duplicate"):
+                form.add_error(
+                    "file",
+                    f'This file already exists in {duplicate.subject.name} as "{duplicate.title}". '
+                    "Tick \"Upload it here anyway\" and re-select the file to add it to this subject too.",
+                )
+            else:
+                resource = form.save(commit=False)
+                resource.uploaded_by = request.user
+                resource.status = "approved" if uploader_role == "faculty" else "pending"
+                resource.save()
+                messages.success(request, "Resource uploaded successfully!")
+                return redirect("my_uploads")
     else:
         form = ResourceForm()
 
-    return render(request, "upload_resource.html", {"form": form})
+    return render(request, "upload_resource.html", {"form": form, "duplicate": duplicate})
 
 
 # ---------------------- MY UPLOADS ----------------------
@@ -195,6 +257,22 @@ def delete_resource(request, id):
     return redirect("my_uploads")
 
 
+# ---------------------- DOWNLOAD RESOURCE ----------------------
+@login_required
+@require_safe
+def download_resource(request, id):
+    resource = get_object_or_404(Resource.objects.select_related("blob"), id=id)
+
+    # Unapproved files are only visible to their uploader and faculty
+    if resource.status != "approved" and not (
+        request.user.is_staff or resource.uploaded_by_id == request.user.id
+    ):
+        raise Http404
+
+    versioned = resource.blob_id is not None and request.GET.get("v") == str(resource.blob_id)
+    return serve_resource(request, resource, versioned=versioned)
+
+
 # ---------------------- ADD BOOKMARK ----------------------
 @login_required
 @require_POST
@@ -230,9 +308,49 @@ def review_uploads(request):
     if not request.user.is_staff:
         return HttpResponseForbidden("Only faculty can review uploads.")
 
+    selected_subject = request.GET.get("subject", "")
+    subject_id = int(selected_subject) if selected_subject.isdigit() else None
+
+    # Each reviewer works on their own leased slice, so several faculty
+    # reviewing at once never get the same uploads
+    claimed = list(claim_reviews(request.user, subject_id=subject_id))
+
+    # The rest of the queue, read-only, paged by (uploaded_at, id)
     pending = Resource.objects.filter(status="pending")
+    if subject_id:
+        pending = pending.filter(subject_id=subject_id)
+    others = keyset_page(
+        pending.exclude(id__in=[r.id for r in claimed])
+        .select_related("subject", "uploaded_by", "claimed_by"),
+        ("uploaded_at", "id"),
+        cursor=request.GET.get("cursor"),
+    )
+
+    subjects = (
+        Subject.objects.filter(resources__status="pending")
+        .annotate(pending_count=Count("resources"))
+        .order_by("semester", "name")
+    )
+
+    return render(request, "review_uploads.html", {
+        "claimed": claimed,
+        "others": others,
+        "lease_cutoff": timezone.now() - LEASE_TIMEOUT,
+        "subjects": subjects,
+        "selected_subject": str(subject_id or ""),
+    })
 
-    return render(request, "review_uploads.html", {"pending": pending})
+
+# ---------------------- RELEASE REVIEW CLAIMS (FACULTY) ----------------------
+@login_required
+@require_POST
+def release_review_claims(request):
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Only faculty can review uploads.")
+
+    released = release_reviews(request.user)
+    messages.info(request, f"Released {released} upload{'s' if released != 1 else ''} back to the queue.")
+    return redirect("review_uploads")
 
 # ---------------------- APPROVE UPLOAD (FACULTY) ----------------------
 @login_required
@@ -242,7 +360,7 @@ def approve_upload(request, id):
 
     resource = get_object_or_404(Resource, id=id)
     resource.status = "approved"
-    resource.save()
+    resource.save(update_fields=["status"])
     messages.success(request, "Resource approved!")
     return redirect("review_uploads")
 
@@ -254,11 +372,52 @@ def reject_upload(request, id):
 
     resource = get_object_or_404(Resource, id=id)
     resource.status = "rejected"
-    resource.save()
+    resource.save(update_fields=["status"])
     messages.error(request, "Resource rejected.")
     return redirect("review_uploads")
 
 
+# ---------------------- BULK MODERATION (FACULTY) ----------------------
+@login_required
+@require_POST
+def bulk_moderate_uploads(request):
+    """
+    Approve or reject many pending uploads at once: either the ticked ids,
+    or (scope=subject) everything pending in one subject.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Only faculty can moderate uploads.")
+
+    status = {"approve": "approved", "reject": "rejected"}.get(request.POST.get("action"))
+    resources = Resource.objects.all()
+
+    if request.POST.get("scope") == "subject":
+        # Anything but an id counts as no subject chosen
+        subject_id = request.POST.get("subject", "")
+        resources = resources.filter(subject_id=subject_id) if subject_id.isdigit() else resources.none()
+    else:
+        ids = [i for i in request.POST.getlist("ids") if i.isdigit()]
+        resources = resources.filter(id__in=ids)
+
+    if status is None:
+        updated = None
+    else:
+        updated = moderate(resources, status)
+
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        if updated is None:
+            return JsonResponse({"error": "action must be approve or reject."}, status=400)
+        return JsonResponse({"updated": updated, "status": status})
+
+    if updated is None:
+        messages.error(request, "Choose approve or reject.")
+    elif updated:
+        messages.success(request, f"{updated} upload{'s' if updated != 1 else ''} {status}.")
+    else:
+        messages.info(request, "Nothing to update: the selected uploads are no longer pending.")
+    return redirect("review_uploads")
+
+
 # ---------------------- DASHBOARD ----------------------
 @login_required
 def dashboard(request):
@@ -275,47 +434,51 @@ def dashboard(request):
     users = User.objects.filter(is_superuser=False).exclude(id=request.user.id)
 
     if query:
-        users = users.filter(
-            Q(username__icontains=query)
-            | Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-            | Q(email__icontains=query)
+        users = filter_users(users, query)
+
+    # Sorting. Every order ends in id so keyset cursors are unambiguous.
+    users = users.annotate(first_key=Lower("first_name"), last_key=Lower("last_name"))
+    orderings = {
+        "name_asc": ("first_key", "last_key", "id"),
+        "name_desc": ("-first_key", "-last_key", "-id"),
+        "newest": ("-date_joined", "-id"),
+        "oldest": ("date_joined", "id"),
+    }
+    ordering = orderings.get(sort, orderings["oldest"])
+
+    # Uploader status for the whole page in one prefetch query
+    users = users.prefetch_related(
+        Prefetch(
+            "uploader_profile",
+            queryset=ApprovedUploader.objects.select_related("approved_by"),
+            to_attr="uploader_entries",
         )
+    )
 
-    # Sorting
-    if sort == "name_asc":
-        users = users.order_by(Lower("first_name"), Lower("last_name"))
-    elif sort == "name_desc":
-        users = users.order_by(Lower("first_name").desc(), Lower("last_name").desc())
-    elif sort == "newest":
-        users = users.order_by("-date_joined")
-    else:
-        users = users.order_by("date_joined")
-
-    # Pagination
-    reg_page = request.GET.get("page")
-    reg_paginator = Paginator(users, 10)
-    reg_page_obj = reg_paginator.get_page(reg_page)
+    # Keyset pagination: no COUNT(*) and no OFFSET scan, so a deep page
+    # costs the same as the first one
+    reg_page_obj = keyset_page(users, ordering, request.GET.get("cursor"), per_page=10)
 
     # Add uploader status
     for u in reg_page_obj:
-        u.uploader_status = ApprovedUploader.objects.filter(student=u).first()
+        u.uploader_status = u.uploader_entries[0] if u.uploader_entries else None
 
     # Promote to faculty tab
     pf_query = request.GET.get("pf_q", "")
     promote_students = User.objects.filter(is_staff=False)
 
     if pf_query:
-        promote_students = promote_students.filter(
-            Q(username__icontains=pf_query)
-            | Q(first_name__icontains=pf_query)
-            | Q(last_name__icontains=pf_query)
-            | Q(email__icontains=pf_query)
-        )
+        promote_students = filter_users(promote_students, pf_query)
+
+    promote_page_obj = keyset_page(
+        promote_students.annotate(first_key=Lower("first_name"), last_key=Lower("last_name")),
+        ("first_key", "last_key", "id"),
+        request.GET.get("pf_cursor"),
+        per_page=10,
+    )
 
-    pf_page = request.GET.get("pf_page")
-    promote_paginator = Paginator(promote_students, 10)
-    promote_page_obj = promote_paginator.get_page(pf_page)
+    # Statistics come from the incrementally maintained counters table
+    counters = get_counters()
 
     context = {
         "tab": tab,
@@ -327,19 +490,70 @@ def dashboard(request):
         "promote_page_obj": promote_page_obj,
         "pf_query": pf_query,
 
+        # Only shown for the unfiltered list, where an estimate is free
+        "users_estimate": None if query else estimated_count(User),
+
         "approved_students": ApprovedUploader.objects.select_related("student", "approved_by"),
         "faculty_list": User.objects.filter(is_staff=True, is_superuser=False),
 
-        "total_departments": Department.objects.count(),
-        "total_subjects": Subject.objects.count(),
-        "total_resources": Resource.objects.count(),
-        "pending_resources": Resource.objects.filter(status="pending").count(),
-        "pending_list": Resource.objects.filter(status="pending"),
+        "total_departments": counters[DashboardCounter.DEPARTMENTS],
+        "total_subjects": counters[DashboardCounter.SUBJECTS],
+        "total_resources": counters[DashboardCounter.RESOURCES],
+        "pending_resources": counters[DashboardCounter.PENDING_RESOURCES],
+        "pending_list": Resource.objects.filter(status="pending").select_related("subject", "uploaded_by"),
     }
 
     return render(request, "dashboard.html", context)
 
 
+# ---------------------- USER TYPE-AHEAD ----------------------
+@login_required
+@require_safe
+def user_search_api(request):
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Only faculty can search users.")
+
+    query = request.GET.get("q", "").strip()
+    scope = request.GET.get("scope", "users")
+
+    try:
+        limit = int(request.GET.get("limit", TYPEAHEAD_LIMIT))
+    except ValueError:
+        limit = TYPEAHEAD_LIMIT
+    limit = max(1, min(limit, TYPEAHEAD_MAX_LIMIT))
+
+    # Same populations as the dashboard's two search boxes
+    if scope == "promote":
+        if not request.user.is_superuser:
+            return HttpResponseForbidden("Only SuperAdmin can promote faculty.")
+        users = User.objects.filter(is_staff=False)
+    else:
+        users = User.objects.filter(is_superuser=False).exclude(id=request.user.id)
+
+    if len(query) < TYPEAHEAD_MIN_LENGTH:
+        return JsonResponse({"query": query, "results": []})
+
+    users = (
+        filter_users(users, query)
+        .order_by(Lower("first_name"), Lower("last_name"), "id")
+        .only("id", "username", "first_name", "last_name", "email", "is_staff")[:limit]
+    )
+
+    return JsonResponse({
+        "query": query,
+        "results": [
+            {
+                "id": u.id,
+                "username": u.username,
+                "name": u.get_full_name(),
+                "email": u.email,
+                "is_staff": u.is_staff,
+            }
+            for u in users
+        ],
+    })
+
+
 # ---------------------- APPROVE STUDENT UPLOADER ----------------------
 @login_required
 @require_POST
@@ -459,6 +673,7 @@ def delete_tutorial(request, tutorial_id):
 
 
 # ---------------- ABOUT SECTION ----------------
+@anonymous_page_cache("about")
 def about(request):
     return render(request, "about.html")
 
@@ -499,8 +714,243 @@ def toggle_bookmark_ajax(request):
     })
 
 
+def bookmark_version(request):
+    return get_version("bookmarks", request.user.id, request, create=True)
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=bookmark_version)
 def bookmark_status_api(request):
+    # Clients send the ETag back in If-None-Match and get an empty 304
+    # until a bookmark changes
     bookmarks = Bookmark.objects.filter(user=request.user)\
                                 .values_list("resource_id", flat=True)
-    return JsonResponse({"bookmarked_ids": list(bookmarks)})
\ No newline at end of file
+    return JsonResponse({
+        "bookmarked_ids": list(bookmarks),
+        "version": bookmark_version(request),
+    })
+
+
+# Upper bound on ids per batch request
+BOOKMARK_BATCH_LIMIT = 500
+
+
+@login_required
+@require_POST
+def bookmark_batch_api(request):
+    """
+    Add and remove many bookmarks at once. Body: JSON
+    {"add": [resource ids], "remove": [resource ids]}. Adding an existing
+    bookmark or removing a missing one is a no-op.
+    """
+    try:
+        data = json.loads(request.body)
+        add = {int(i) for i in data.get("add", [])}
+        remove = {int(i) for i in data.get("remove", [])}
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({"error": "Expected {\"add\": [...], \"remove\": [...]} with resource ids."}, status=400)
+
+    if len(add) + len(remove) > BOOKMARK_BATCH_LIMIT:
+        return JsonResponse({"error": f"At most {BOOKMARK_BATCH_LIMIT} ids per request."}, status=400)
+
+    with transaction.atomic():
+        if add:
+            existing = Resource.objects.filter(id__in=add).values_list("id", flat=True)
+            Bookmark.objects.bulk_create(
+                [Bookmark(user=request.user, resource_id=resource_id) for resource_id in existing],
+                ignore_conflicts=True,
+            )
+        if remove:
+            Bookmark.objects.filter(user=request.user, resource_id__in=remove).delete()
+        # bulk_create sends no signals (the delete above bumps by itself)
+        bump_version("bookmarks", request.user.id)
+
+    return JsonResponse({"version": bookmark_version(request)})
+
+# ---------------- SEARCH ----------------
+def parse_search_params(request):
+    def as_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    limit = as_int(request.GET.get("limit")) or search_index.DEFAULT_LIMIT
+
+    return {
+        "query": request.GET.get("q", "").strip(),
+        "department": as_int(request.GET.get("department")),
+        "semester": as_int(request.GET.get("semester")),
+        "resource_type": request.GET.get("type") or None,
+        "limit": max(1, min(limit, search_index.MAX_LIMIT)),
+    }
+
+
+@login_required
+def search(request):
+    params = parse_search_params(request)
+    results = search_index.search(**params)
+
+    return render(request, "search.html", {
+        "params": params,
+        "results": results,
+        "departments": Department.objects.all(),
+        "resource_types": Resource.RESOURCE_TYPES + TutorialSuggestion.RESOURCE_TYPES,
+    })
+
+
+@login_required
+def search_api(request):
+    params = parse_search_params(request)
+    results = search_index.search(**params)
+
+    return JsonResponse({
+        "query": params["query"],
+        "results": [
+            {
+                "kind": doc.kind,
+                "id": doc.object_id,
+                "title": doc.title,
+                "resource_type": doc.resource_type,
+                "subject": doc.subject.name,
+                "semester": doc.semester,
+                "url": reverse("subject_detail", args=[doc.subject_id]),
+            }
+            for doc in results
+        ],
+    })
+
+
+# ---------------- DUPLICATE FILE CHECK ----------------
+@login_required
+def resource_duplicate_api(request):
+    sha = request.GET.get("sha256", "").lower()
+    duplicate = find_duplicate(sha, request.user) if len(sha) == 64 else None
+
+    if duplicate is None:
+        return JsonResponse({"exists": False})
+
+    return JsonResponse({
+        "exists": True,
+        "title": duplicate.title,
+        "subject": duplicate.subject.name,
+        "subject_id": duplicate.subject_id,
+    })
+
+
+# ---------------- CHUNKED UPLOADS ----------------
+def can_upload(request):
+    return request.user.is_staff or is_approved_uploader(request)
+
+
+def upload_session_json(session):
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "size": session.size,
+        "chunk_size": session.chunk_size,
+        "offset": session.offset,
+        "status": session.status,
+    }
+
+
+@login_required
+@require_POST
+def upload_session_create(request):
+    if not can_upload(request):
+        return JsonResponse({"error": "You are not approved to upload."}, status=403)
+
+    try:
+        size = int(request.POST.get("size", ""))
+    except ValueError:
+        return JsonResponse({"error": "size is required."}, status=400)
+
+    try:
+        session = start_session(
+            request.user,
+            request.POST.get("filename", ""),
+            size,
+            request.POST.get("sha256", ""),
+        )
+    except ChunkError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    return JsonResponse(upload_session_json(session), status=201)
+
+
+@login_required
+def upload_session_status(request, upload_id):
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+    return JsonResponse(upload_session_json(session))
+
+
+@login_required
+@require_POST
+def upload_session_chunk(request, upload_id):
+    """
+    Raw chunk bytes in the request body, at ?offset=N, with the chunk's
+    SHA-256 in the X-Chunk-SHA256 header. Replies with the new offset.
+    """
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user, status="active")
+
+    try:
+        offset = int(request.GET.get("offset", ""))
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return JsonResponse({"error": "offset is required."}, status=400)
+
+    try:
+        write_chunk(session, offset, request, length, request.headers.get("X-Chunk-SHA256", ""))
+    except ChunkError as e:
+        session.refresh_from_db(fields=["offset"])
+        return JsonResponse({"error": str(e), "offset": session.offset}, status=e.status)
+
+    return JsonResponse(upload_session_json(session))
+
+
+@login_required
+@require_POST
+def upload_session_complete(request, upload_id):
+    """
+    Turn a fully received upload into a Resource. Takes the same fields as
+    the upload form (minus the file) and answers with form errors as JSON;
+    the session stays open until it succeeds so the client can fix and retry.
+    """
+    if not can_upload(request):
+        return JsonResponse({"error": "You are not approved to upload."}, status=403)
+
+    session = get_object_or_404(UploadSession, id=upload_id, user=request.user, status="active")
+
+    try:
+        assembled = assemble(session)
+    except ChunkError as e:
+        return JsonResponse({"error": str(e), "offset": session.offset}, status=e.status)
+
+    with assembled:
+        form = ResourceForm(request.POST, {"file": assembled})
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+
+        duplicate = find_duplicate(assembled.sha256, request.user)
+        if duplicate and not request.POST.get("allow_duplicate"):
+            return JsonResponse({
+                "error": f'This file already exists in {duplicate.subject.name} as "{duplicate.title}".',
+                "duplicate": {"title": duplicate.title, "subject_id": duplicate.subject_id},
+            }, status=409)
+
+        resource = form.save(commit=False)
+        resource.uploaded_by = request.user
+        resource.status = "approved" if request.user.is_staff else "pending"
+        resource.save()
+
+    # The part file was moved into storage, or left behind if the content
+    # was already stored
+    session.resource = resource
+    discard_session(session, "complete")
+
+    return JsonResponse({
+        "resource_id": resource.id,
+        "status": resource.status,
+        "redirect": reverse("my_uploads"),
+    }, status=201)
@@ -112,6 +112,21 @@ else:
 #     }
 # }
 
+# Cache (per-process by default; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend such as file-based or Redis when running several workers).
+# Cached pages and fragments are keyed on version stamps kept in the
+# database, so a per-process cache mostly costs hit rate: other workers see
+# a page invalidation within core.pagecache.PAGE_VERSION_TIMEOUT.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="studybuddy"),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -139,6 +154,54 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are hashed (SHA-256) while they stream in, for deduplication
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.HashingMemoryFileUploadHandler',
+    'core.uploads.HashingTemporaryFileUploadHandler',
+]
+
+# Resource downloads. Set SENDFILE_BACKEND to "nginx" (X-Accel-Redirect to
+# an internal location aliased to MEDIA_ROOT) or "apache" (X-Sendfile) to let
+# the front proxy transfer the bytes after Django has checked access.
+SENDFILE_BACKEND = config("SENDFILE_BACKEND", default="")
+SENDFILE_NGINX_PREFIX = config("SENDFILE_NGINX_PREFIX", default="/protected-media/")
+DOWNLOAD_MAX_AGE = 60 * 60 * 24 * 365
+
+# Resumable uploads: partial files live outside MEDIA_ROOT until complete
+CHUNKED_UPLOAD_DIR = config("CHUNKED_UPLOAD_DIR", default=str(BASE_DIR / "uploads_tmp"))
+CHUNKED_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = config("CHUNKED_UPLOAD_MAX_SIZE", default=500 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_TTL = 60 * 60 * 24
+
+# Study assistant chat. CHAT_PROVIDER picks a backend registered in
+# api.llm: "groq", or "stub" for offline development and load tests.
+GROQ_API_KEY = config("GROQ_API_KEY", default="")
+CHAT_PROVIDER = config("CHAT_PROVIDER", default="groq")
+CHAT_MODEL = config("CHAT_MODEL", default="openai/gpt-oss-120b")
+CHAT_TIMEOUT = config("CHAT_TIMEOUT", default=30.0, cast=float)
+CHAT_MAX_CONNECTIONS = config("CHAT_MAX_CONNECTIONS", default=100, cast=int)
+CHAT_STUB_LATENCY = config("CHAT_STUB_LATENCY", default=0.5, cast=float)
+CHAT_STUB_TOKEN_DELAY = config("CHAT_STUB_TOKEN_DELAY", default=0.02, cast=float)
+
+# Finished answers are reused for identical questions (per process, LRU)
+CHAT_CACHE_SIZE = config("CHAT_CACHE_SIZE", default=1000, cast=int)
+CHAT_CACHE_TTL = config("CHAT_CACHE_TTL", default=60 * 60, cast=int)
+
+# Backpressure: messages per second (and burst) per client and for the
+# whole process, unanswered messages a socket may queue, and concurrent
+# upstream calls per process
+CHAT_USER_RATE = config("CHAT_USER_RATE", default=0.2, cast=float)
+CHAT_USER_BURST = config("CHAT_USER_BURST", default=5, cast=int)
+CHAT_GLOBAL_RATE = config("CHAT_GLOBAL_RATE", default=50.0, cast=float)
+CHAT_GLOBAL_BURST = config("CHAT_GLOBAL_BURST", default=200, cast=int)
+CHAT_QUEUE_SIZE = config("CHAT_QUEUE_SIZE", default=3, cast=int)
+CHAT_MAX_IN_FLIGHT = config("CHAT_MAX_IN_FLIGHT", default=64, cast=int)
+
+# Conversation memory per socket: recent question/answer pairs sent along
+# with each message, capped in count and in estimated tokens
+CHAT_HISTORY_EXCHANGES = config("CHAT_HISTORY_EXCHANGES", default=10, cast=int)
+CHAT_HISTORY_TOKENS = config("CHAT_HISTORY_TOKENS", default=1500, cast=int)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Messages styling
@@ -50,4 +50,7 @@ urlpatterns = [
 
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Resource files are served by core.views.download_resource, which checks
+# access; only public media (department images) is served directly, and only
+# in development
+urlpatterns += static(settings.MEDIA_URL + "department_images/", document_root=settings.MEDIA_ROOT / "department_images")